@@ -1,58 +1,358 @@
 """Script to convert Markdown files to DOCX format."""
 
 import argparse
+import hashlib
+import mmap
+import os
 import re
+import sys
 import tempfile
 import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from copy import deepcopy
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape
 
 try:
     from docx import Document
     from docx.shared import Pt, Inches, RGBColor
     from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    from docx.oxml import parse_xml
     from docx.oxml.ns import qn
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("Error: Required packages not installed.")
     print("Please install: uv sync")
     print("Or manually: pip install python-docx requests")
     exit(1)
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Image pattern: ![alt](url) or ![](url), precompiled for the hot path
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\(([^)]+)\)')
+
+
+def _build_session() -> "requests.Session":
+    """Build a requests session with keep-alive pooling and retries.
+
+    Most course images come from the same CDN host, so reusing one
+    session avoids a fresh TCP+TLS handshake per download.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['User-Agent'] = (
+        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+    )
+    return session
+
+
+_SESSION = _build_session()
+
+# Ready-made "A. " .. "Z. " option prefixes, indexed by option position
+_OPTION_LETTERS = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_OPTION_PREFIXES = [f'{letter}. ' for letter in _OPTION_LETTERS]
+
+# Shared font constants, computed once instead of per-run
+_FONT_NAME = '宋体'
+_QN_EASTASIA = qn('w:eastAsia')
+_PT_0 = Pt(0)
+_PT_95 = Pt(9.5)
+_PT_10 = Pt(10)
+_PT_11 = Pt(11)
+_PT_14 = Pt(14)
+_INDENT_LIST = Inches(0.2)
+_INDENT_OPTION = Inches(0.3)
+_IMG_WIDTH_4 = Inches(4)
+_IMG_WIDTH_5 = Inches(5)
+_IMG_WIDTH_6 = Inches(6)
+_QN_DOCPR = qn('wp:docPr')
+
+
+_GREEN = RGBColor(0, 128, 0)
+
+
+@lru_cache(maxsize=None)
+def _rpr_element(size, name, bold, color):
+    """Build the rPr element for a (size, font, bold, color) combination.
+
+    Only a handful of combinations occur, so each is parsed once and
+    cloned per run afterwards.
+    """
+    bits = [f'<w:rPr {_W_NS}>']
+    bits.append(f'<w:rFonts w:ascii="{name}" w:eastAsia="{name}" w:hAnsi="{name}"/>')
+    if bold:
+        bits.append('<w:b/>')
+    if color is not None:
+        bits.append(f'<w:color w:val="{color}"/>')
+    bits.append(f'<w:sz w:val="{int(size.pt * 2)}"/>')
+    bits.append('</w:rPr>')
+    return parse_xml(''.join(bits))
+
+
+def _style_run(run, size=_PT_95, name=_FONT_NAME, bold=False, color=None):
+    """Apply font styling to a run by attaching a prebuilt rPr clone.
+
+    Cloning a cached rPr fragment replaces four descriptor writes (size,
+    name, eastAsia rFonts, bold) with a single deepcopy and insert.
 
-def find_markdown_files(markdown_dir: Path) -> dict:
+    Args:
+        run: Run to style
+        size: Font size (default: 9.5pt)
+        name: Font name (default: 宋体)
+        bold: Whether the run should be bold
+        color: Optional RGBColor for the run text
+    """
+    run._element.insert(0, deepcopy(_rpr_element(size, name, bold, color)))
+
+
+def _add_run(p, text, size=_PT_95, bold=False, color=None):
+    """Add a run to a paragraph with the document's default CJK font styling.
+
+    Args:
+        p: Paragraph to add the run to
+        text: Run text
+        size: Font size (default: 9.5pt)
+        bold: Whether the run should be bold
+        color: Optional RGBColor for the run text
+
+    Returns:
+        The created run
+    """
+    run = p.add_run(text)
+    _style_run(run, size, bold=bold, color=color)
+    return run
+
+
+def _build_template_bytes() -> bytes:
+    """Build a serialized blank document with default style and margins set.
+
+    Configuring the Normal style and page margins once here lets every
+    conversion start from Document(BytesIO(_TEMPLATE_BYTES)) instead of
+    repeating the style and section setup per file.
+    """
+    doc = Document()
+
+    style = doc.styles['Normal']
+    font = style.font
+    font.name = _FONT_NAME
+    font.size = _PT_95
+    style._element.rPr.rFonts.set(_QN_EASTASIA, _FONT_NAME)
+
+    # Set page margins (compact)
+    for section in doc.sections:
+        section.top_margin = Inches(0.4)
+        section.bottom_margin = Inches(0.4)
+        section.left_margin = Inches(0.5)
+        section.right_margin = Inches(0.5)
+
+    buf = BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+_TEMPLATE_BYTES = _build_template_bytes()
+
+# XML fragments for the checkbox-option fast path: the paragraph properties
+# (0.3" indent, zero spacing) and run properties are constant, so text-only
+# options can be assembled as one XML string and appended to the body in a
+# single parse instead of a dozen add_paragraph/add_run property writes.
+_W_NS = 'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+_OPTION_PPR = '<w:pPr><w:spacing w:before="0" w:after="0"/><w:ind w:left="432"/></w:pPr>'
+_OPTION_RPR = (
+    '<w:rPr><w:rFonts w:ascii="宋体" w:eastAsia="宋体" w:hAnsi="宋体"/>{bold}'
+    '<w:sz w:val="19"/></w:rPr>'
+)
+_CORRECT_MARKER_RUN = (
+    '<w:r><w:rPr><w:rFonts w:ascii="宋体" w:eastAsia="宋体" w:hAnsi="宋体"/>'
+    '<w:b/><w:color w:val="008000"/><w:sz w:val="19"/></w:rPr>'
+    '<w:t xml:space="preserve"> （正确答案）</w:t></w:r>'
+)
+
+
+# The other two hot paragraph shapes — headings and plain text — get the
+# same treatment: a constant template formatted with the escaped text and
+# parsed once, instead of ~10 python-docx property writes per paragraph.
+_RFONTS = '<w:rFonts w:ascii="宋体" w:eastAsia="宋体" w:hAnsi="宋体"/>'
+_HEADING_P = {
+    '# ': (
+        f'<w:p {_W_NS}><w:pPr><w:jc w:val="center"/></w:pPr>'
+        f'<w:r><w:rPr>{_RFONTS}<w:b/><w:sz w:val="28"/></w:rPr>'
+        '<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+    ),
+    '## ': (
+        f'<w:p {_W_NS}><w:r><w:rPr>{_RFONTS}<w:b/><w:sz w:val="22"/></w:rPr>'
+        '<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+    ),
+    '### ': (
+        f'<w:p {_W_NS}><w:r><w:rPr>{_RFONTS}<w:b/><w:sz w:val="20"/></w:rPr>'
+        '<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+    ),
+}
+_TEXT_P = (
+    f'<w:p {_W_NS}><w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr>'
+    f'<w:r><w:rPr>{_RFONTS}<w:sz w:val="19"/></w:rPr>'
+    '<w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+)
+
+
+def _append_xml_paragraph(doc, template, text):
+    """Format a paragraph template with escaped text and append it to the body.
+
+    Args:
+        doc: Document object
+        template: XML paragraph template with a {text} placeholder
+        text: Paragraph text (escaped here, must not contain image markers)
+    """
+    # Insert before the trailing sectPr, like add_paragraph does (see
+    # _append_option_paragraph)
+    doc.element.body.insert_element_before(
+        parse_xml(template.format(text=escape(text))), 'w:sectPr'
+    )
+
+
+def _append_option_paragraph(doc, prefix, content, is_correct):
+    """Append a text-only checkbox option as a directly-built XML paragraph.
+
+    Args:
+        doc: Document object
+        prefix: Option letter prefix (e.g. "A. ")
+        content: Option text content (must not contain image markers)
+        is_correct: Whether this option is the correct answer
+    """
+    rpr = _OPTION_RPR.format(bold='<w:b/>' if is_correct else '')
+    runs = (
+        f'<w:r>{rpr}<w:t xml:space="preserve">{escape(prefix)}</w:t></w:r>'
+        f'<w:r>{rpr}<w:t xml:space="preserve">{escape(content)}</w:t></w:r>'
+    )
+    if is_correct:
+        runs += _CORRECT_MARKER_RUN
+    # Insert before the trailing sectPr, like add_paragraph does; a bare
+    # append would land after the section properties and reorder the
+    # document relative to paragraphs added through python-docx
+    doc.element.body.insert_element_before(
+        parse_xml(f'<w:p {_W_NS}>{_OPTION_PPR}{runs}</w:p>'), 'w:sectPr'
+    )
+
+
+def find_markdown_files(markdown_dir: Path, docx_dir: Optional[Path] = None) -> tuple:
     """Find all Markdown files organized by course.
-    
+
     Args:
         markdown_dir: Directory containing course subdirectories with Markdown files
-        
+        docx_dir: Optional DOCX output directory; when given, Markdown files
+            whose DOCX output already exists are dropped during the scan
+
     Returns:
-        Dictionary mapping course names to lists of markdown files
+        Tuple of (dictionary mapping course names to lists of markdown files,
+        dictionary mapping course names to skipped-file counts)
     """
     courses_data = {}
-    
+    skipped_counts = {}
+
     if not markdown_dir.exists():
         print(f"Markdown directory not found: {markdown_dir}")
         print("  Please run convert_markdown.py first to generate Markdown files")
-        return courses_data
-    
-    # Iterate through course directories
-    for course_dir in markdown_dir.iterdir():
-        if not course_dir.is_dir():
-            continue
-        
-        course_name = course_dir.name
-        markdown_files = []
-        
-        # Find all Markdown files
-        for md_file in course_dir.glob("*.md"):
-            markdown_files.append(md_file)
-        
-        if markdown_files:
-            courses_data[course_name] = markdown_files
-    
-    return courses_data
+        return courses_data, skipped_counts
+
+    # Iterate through course directories with scandir so each entry's
+    # cached d_type is reused instead of issuing a stat per file
+    with os.scandir(markdown_dir) as it:
+        for entry in it:
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+
+            markdown_files = []
+            skipped = 0
+
+            # List the course's existing DOCX outputs once instead of
+            # stat-ing one candidate path per markdown file
+            existing_docx = set()
+            if docx_dir is not None:
+                safe_course_name = entry.name.replace("/", "_").replace("\\", "_")
+                course_docx_dir = os.path.join(docx_dir, safe_course_name)
+                try:
+                    with os.scandir(course_docx_dir) as docx_it:
+                        existing_docx = {e.name for e in docx_it}
+                except FileNotFoundError:
+                    pass
+
+            # Find all Markdown files
+            with os.scandir(entry.path) as course_it:
+                for file_entry in course_it:
+                    name = file_entry.name
+                    if not (name.endswith(".md") and file_entry.is_file(follow_symlinks=False)):
+                        continue
+
+                    # Skip files whose DOCX output already exists
+                    if name[:-3] + ".docx" in existing_docx:
+                        skipped += 1
+                        continue
+
+                    # Keep the raw path string; main promotes to Path only
+                    # where an API requires it
+                    markdown_files.append(file_entry.path)
+
+            if markdown_files:
+                courses_data[entry.name] = markdown_files
+            if skipped:
+                skipped_counts[entry.name] = skipped
+
+    return courses_data, skipped_counts
+
+
+# Pictures render at 4-6 inches, so anything wider than this only bloats
+# the output; 1600 px leaves plenty of headroom at printer DPI
+_MAX_IMAGE_PX = 1600
+
+
+def _shrink_image(cache_file: Path) -> None:
+    """Downscale an oversized cached image in place.
+
+    Runs once at cache time so every DOCX that embeds the image carries
+    the recompressed bytes. No-op when Pillow is unavailable or the file
+    is not a decodable image.
+    """
+    if Image is None:
+        return
+    tmp_file = cache_file.with_name(cache_file.name + '.tmp')
+    try:
+        img = Image.open(cache_file)
+        if img.width > _MAX_IMAGE_PX:
+            img.thumbnail((_MAX_IMAGE_PX, _MAX_IMAGE_PX), Image.LANCZOS)
+            # Encode to a sibling temp file in the image's own format and
+            # swap in only on success; saving straight over cache_file
+            # would truncate it first and a failed encode (e.g. RGBA data
+            # behind a .jpg name) would leave a corrupt entry that
+            # poisons every later run
+            img.save(tmp_file, format=img.format, optimize=True, quality=85)
+            os.replace(tmp_file, cache_file)
+    except Exception:
+        # Keep the original bytes if the file can't be decoded or re-saved
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
 
 
 def download_image(image_url: str, cache_dir: Optional[Path] = None) -> Optional[Path]:
@@ -77,40 +377,55 @@ def download_image(image_url: str, cache_dir: Optional[Path] = None) -> Optional
             parsed_url = urlparse(image_url)
             filename = Path(parsed_url.path).name
             if not filename or '.' not in filename:
-                # Generate extension from content type or use default
-                filename = f"image_{hash(image_url) % 100000}.jpg"
+                # URL-addressed name: BLAKE2b is collision-free in practice
+                # and stable across runs, unlike the randomized builtin hash
+                ext = Path(parsed_url.path).suffix.lower() or '.jpg'
+                digest = hashlib.blake2b(image_url.encode(), digest_size=16).hexdigest()
+                filename = digest + ext
             cache_file = cache_dir / filename
             
             # Check if already cached
             if cache_file.exists():
                 return cache_file
-            
-            # Download image
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(image_url, headers=headers, timeout=30)
+
+            # Download image, streaming to a uniquely-named sibling temp
+            # file swapped into place on success; writing cache_file
+            # directly would let an interrupted run (or two workers on
+            # the same URL) leave a truncated entry that the exists()
+            # check above then serves on every later run — the same
+            # poisoned-cache mode _shrink_image guards against
+            response = _SESSION.get(image_url, timeout=30, stream=True)
             response.raise_for_status()
-            
-            # Save to cache
-            with open(cache_file, 'wb') as f:
-                f.write(response.content)
-            
+
+            tmp = tempfile.NamedTemporaryFile(
+                dir=cache_dir, suffix='.tmp', delete=False
+            )
+            try:
+                with tmp:
+                    for chunk in response.iter_content(65536):
+                        tmp.write(chunk)
+                os.replace(tmp.name, cache_file)
+            except BaseException:
+                try:
+                    os.unlink(tmp.name)
+                except OSError:
+                    pass
+                raise
+
+            _shrink_image(cache_file)
             return cache_file
         else:
             # Use temporary file if no cache directory
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            response = requests.get(image_url, headers=headers, timeout=30)
+            response = _SESSION.get(image_url, timeout=30, stream=True)
             response.raise_for_status()
-            
+
             # Create temporary file
             suffix = Path(urlparse(image_url).path).suffix or '.jpg'
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
-            temp_file.write(response.content)
+            for chunk in response.iter_content(65536):
+                temp_file.write(chunk)
             temp_file.close()
-            
+
             return Path(temp_file.name)
     except Exception as e:
         print(f"  Warning: Failed to download image {image_url}: {str(e)}")
@@ -142,8 +457,7 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
         font_size = Pt(9.5)
     
     created_paragraphs = []
-    image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    image_matches = list(re.finditer(image_pattern, content))
+    image_matches = list(_IMAGE_RE.finditer(content))
     
     if not image_matches:
         # No images, just add text
@@ -151,11 +465,7 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
             paragraph = doc.add_paragraph()
             created_paragraphs.append(paragraph)
         run = paragraph.add_run(content)
-        run.font.size = font_size
-        run.font.name = font_name
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
-        if bold:
-            run.font.bold = True
+        _style_run(run, font_size, font_name, bold)
         return created_paragraphs
     
     # Has images, process them
@@ -169,11 +479,7 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
                     paragraph = doc.add_paragraph()
                     created_paragraphs.append(paragraph)
                 run = paragraph.add_run(text_part)
-                run.font.size = font_size
-                run.font.name = font_name
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
-                if bold:
-                    run.font.bold = True
+                _style_run(run, font_size, font_name, bold)
         
         # Process image
         img_url = img_match.group(2)
@@ -182,6 +488,7 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
         # Download and insert image
         img_path = download_image(img_url, image_cache_dir)
         if img_path and img_path.exists():
+            img_para = None
             try:
                 if inline_images and paragraph is not None:
                     # Add image inline in the same paragraph (for options)
@@ -202,23 +509,23 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
                     img_run.add_picture(str(img_path), width=Inches(5 if inline_images else 6))
             except Exception as e:
                 print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
+                # Drop the speculative picture paragraph instead of leaving it empty
+                if img_para is not None:
+                    created_paragraphs.remove(img_para)
+                    img_para._element.getparent().remove(img_para._element)
                 # Add alt text as fallback
                 if paragraph is None:
                     paragraph = doc.add_paragraph()
                     created_paragraphs.append(paragraph)
                 run = paragraph.add_run(f"[图片: {img_alt}]" if img_alt else "[图片]")
-                run.font.size = font_size
-                run.font.name = font_name
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+                _style_run(run, font_size, font_name)
         else:
             # Add alt text as fallback
             if paragraph is None:
                 paragraph = doc.add_paragraph()
                 created_paragraphs.append(paragraph)
             run = paragraph.add_run(f"[图片加载失败: {img_alt}]" if img_alt else "[图片加载失败]")
-            run.font.size = font_size
-            run.font.name = font_name
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
+            _style_run(run, font_size, font_name)
         
         last_pos = img_match.end()
     
@@ -230,477 +537,513 @@ def add_text_with_images(doc: Document, content: str, image_cache_dir: Optional[
                 paragraph = doc.add_paragraph()
                 created_paragraphs.append(paragraph)
             run = paragraph.add_run(text_part)
-            run.font.size = font_size
-            run.font.name = font_name
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), font_name)
-            if bold:
-                run.font.bold = True
+            _style_run(run, font_size, font_name, bold)
     
     return created_paragraphs
 
 
-def parse_markdown_to_docx(md_content: str, doc: Document, image_cache_dir: Optional[Path] = None):
-    """Parse Markdown content and add it to a DOCX document with compact formatting.
-    
+# Files above this size are read through mmap to skip the user-space copy
+_MMAP_THRESHOLD = 1024 * 1024
+
+
+def _read_markdown(md_file: Union[str, Path]) -> str:
+    """Read a markdown file's content as UTF-8.
+
+    Small files are read in one shot; merged course files past the
+    threshold go through mmap so the raw bytes stay out of the heap and
+    only the decoded str is materialized. Invalid bytes are replaced
+    rather than aborting the whole batch on one corrupt file.
+    """
+    if os.stat(md_file).st_size > _MMAP_THRESHOLD:
+        with open(md_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm[:].decode('utf-8', errors='replace')
+    with open(md_file, 'rb') as f:
+        return f.read().decode('utf-8', errors='replace')
+
+
+@lru_cache(maxsize=8192)
+def _cached_download(image_url: str, cache_dir: Optional[Path]) -> Optional[Path]:
+    """Memoized download_image.
+
+    A URL repeated across files in one run resolves from this cache
+    without touching the network or even stat-ing the cache file.
+    """
+    return download_image(image_url, cache_dir)
+
+
+def _prefetch_images(md_content: str, image_cache_dir: Optional[Path]) -> dict:
+    """Download every image referenced in md_content concurrently.
+
+    Downloads are I/O-bound, so fetching them through a thread pool before
+    the parse walk turns N sequential round-trips into roughly one.
+
     Args:
         md_content: Markdown content string
-        doc: python-docx Document object
-        image_cache_dir: Directory to cache downloaded images (optional)
+        image_cache_dir: Directory to cache downloaded images
+
+    Returns:
+        Dict mapping image URL to local Path (or None for failed downloads)
     """
-    lines = md_content.split('\n')
-    i = 0
-    
-    # Image pattern: ![alt](url) or ![](url)
-    image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-    
-    # Set default font for the document
-    style = doc.styles['Normal']
-    font = style.font
-    font.name = '宋体'
-    font.size = Pt(9.5)
-    style._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-    
-    # Track if we're in an options section
-    in_options_section = False
-    option_index = 0
-    
-    while i < len(lines):
-        line = lines[i].strip()
-        original_line = lines[i]
-        
-        # Skip empty lines (we'll add minimal spacing manually)
-        # Don't reset in_options_section on empty lines - options may have empty lines between them
-        if not line:
-            i += 1
-            continue
-        
-        # H1 - Title
-        if line.startswith('# '):
-            title = line[2:].strip()
-            p = doc.add_paragraph()
-            p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-            run = p.add_run(title)
-            run.font.size = Pt(14)
-            run.font.bold = True
-            run.font.name = '宋体'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            in_options_section = False
-            option_index = 0
-            i += 1
-            continue
-        
-        # H2 - Section
-        if line.startswith('## '):
-            title = line[3:].strip()
-            p = doc.add_paragraph()
-            run = p.add_run(title)
-            run.font.size = Pt(11)
-            run.font.bold = True
-            run.font.name = '宋体'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            in_options_section = False
-            option_index = 0
-            i += 1
-            continue
-        
+    urls = {m.group(2) for m in _IMAGE_RE.finditer(md_content)}
+    url_to_path = {}
+    if urls:
+        with ThreadPoolExecutor(max_workers=min(16, len(urls))) as pool:
+            futures = {
+                pool.submit(_cached_download, url, image_cache_dir): url
+                for url in urls
+            }
+            for future in as_completed(futures):
+                url_to_path[futures[future]] = future.result()
+    return url_to_path
+
+
+def _resolve_image(img_url, state):
+    """Return the local path for an image URL, preferring the prefetch map.
+
+    Falls back to a blocking download (and memoizes it) when the parser is
+    invoked without a prefetch pass.
+    """
+    url_to_path = state['url_to_path']
+    if img_url in url_to_path:
+        return url_to_path[img_url]
+    path = _cached_download(img_url, state['image_cache_dir'])
+    url_to_path[img_url] = path
+    return path
+
+
+def _render_inline_images(p, text, image_matches, state, bold=False, img_width=None):
+    """Emit interleaved text runs and inline pictures into a paragraph.
+
+    Shared by the bold-label and checkbox-option handlers, which differ
+    only in run boldness and picture width.
+
+    Args:
+        p: Paragraph receiving the runs
+        text: Source text containing image markers
+        image_matches: Precomputed _IMAGE_RE matches over text
+        state: Parser state (used to resolve image paths)
+        bold: Whether text runs should be bold
+        img_width: Inline picture width (default: 5 inches)
+    """
+    if img_width is None:
+        img_width = _IMG_WIDTH_5
+    last_pos = 0
+    for img_match in image_matches:
+        # Add text before image
+        if img_match.start() > last_pos:
+            text_part = text[last_pos:img_match.start()].strip()
+            if text_part:
+                _add_run(p, text_part, bold=bold)
+
+        # Process image
+        img_url = img_match.group(2)
+        img_alt = img_match.group(1) or ""
+
+        # Download and insert image inline in the same paragraph
+        img_path = _resolve_image(img_url, state)
+        if img_path and img_path.exists():
+            try:
+                _insert_picture(p, img_path, img_width, state)
+            except Exception as e:
+                print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
+                # Add alt text as fallback
+                _add_run(p, f"[图片: {img_alt}]" if img_alt else "[图片]")
+        else:
+            # Add alt text as fallback
+            _add_run(p, f"[图片加载失败: {img_alt}]" if img_alt else "[图片加载失败]")
+
+        last_pos = img_match.end()
+
+    # Add remaining text after last image
+    if last_pos < len(text):
+        text_part = text[last_pos:].strip()
+        if text_part:
+            _add_run(p, text_part, bold=bold)
+
+
+def _insert_picture(p, img_path, width, state):
+    """Add a picture run, reusing cached drawing XML for repeat images.
+
+    The first insert of a given (path, width) goes through add_picture,
+    which probes the file, computes the scaled extent, and registers the
+    image part. Later inserts clone that drawing element — zero file I/O
+    — and only bump the clone's docPr id to keep it unique.
+
+    Args:
+        p: Paragraph receiving the picture run
+        img_path: Local path of the image file
+        width: Rendered picture width
+        state: Parser state carrying the per-document picture cache
+    """
+    run = p.add_run()
+    key = (str(img_path), width)
+    template = state['picture_cache'].get(key)
+    try:
+        if template is None:
+            shape = run.add_picture(str(img_path), width=width)
+            state['picture_cache'][key] = shape._inline.getparent()
+        else:
+            drawing = deepcopy(template)
+            state['picture_seq'] += 1
+            docpr = drawing[0].find(_QN_DOCPR)
+            if docpr is not None:
+                docpr.set('id', str(state['picture_seq']))
+            run._element.append(drawing)
+    except Exception:
+        # Remove the empty run so the failure leaves no trace behind
+        p._element.remove(run._element)
+        raise
+
+
+def _handle_header(line, original_line, doc, state):
+    """Render H1/H2/H3 headings; other '#' lines fall through to plain text."""
+    # line is already stripped, so the slices cannot carry stray whitespace
+    if line.startswith('### '):
         # H3 - Question number
-        if line.startswith('### '):
-            title = line[4:].strip()
+        _append_xml_paragraph(doc, _HEADING_P['### '], line[4:])
+    elif line.startswith('## '):
+        # H2 - Section
+        _append_xml_paragraph(doc, _HEADING_P['## '], line[3:])
+    elif line.startswith('# '):
+        # H1 - Title (centered)
+        _append_xml_paragraph(doc, _HEADING_P['# '], line[2:])
+    else:
+        return False
+    state['in_options_section'] = False
+    state['option_index'] = 0
+    return True
+
+
+def _split_bold(line):
+    """Split a '**label**rest' line into its bold and remainder parts.
+
+    str.find on the fixed '**' delimiter does the job of the old
+    \\*\\*(.+?)\\*\\* regex without the regex engine's lazy backtracking.
+
+    Args:
+        line: Stripped line known to start with '**'
+
+    Returns:
+        Tuple of (bold_text, rest_text), or None if no closing '**' exists
+    """
+    close = line.find('**', 2)
+    if close <= 2:
+        return None
+    return line[2:close], line[close + 2:].lstrip()
+
+
+def _handle_bold(line, original_line, doc, state):
+    """Render '**label**' lines and track entry into an options section."""
+    if not line.startswith('**'):
+        return False
+
+    # "**选项：**" starts an options section
+    if '**选项：**' in line:
+        state['in_options_section'] = True
+        state['option_index'] = 0
+        # Still add the line
+        parts = _split_bold(line)
+        if parts:
+            bold_text, rest_text = parts
             p = doc.add_paragraph()
-            run = p.add_run(title)
-            run.font.size = Pt(10)
-            run.font.bold = True
-            run.font.name = '宋体'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            in_options_section = False
-            option_index = 0
-            i += 1
-            continue
-        
-        # Check for "**选项：**" to start options section
-        if '**选项：**' in line:
-            in_options_section = True
-            option_index = 0
-            # Still add the line
-            match = re.match(r'\*\*(.+?)\*\*\s*(.*)', line)
-            if match:
-                bold_text = match.group(1)
-                rest_text = match.group(2)
-                p = doc.add_paragraph()
-                run1 = p.add_run(bold_text)
-                run1.font.bold = True
-                run1.font.size = Pt(9.5)
-                run1.font.name = '宋体'
-                run1._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                if rest_text:
-                    run2 = p.add_run(rest_text)
-                    run2.font.size = Pt(9.5)
-                    run2.font.name = '宋体'
-                    run2._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            i += 1
-            continue
-        
-        # Checkbox options - convert to ABCD format (only in options section)
-        # Also check if this looks like an option (starts with - [ ] or - [x] after "**选项：**" section)
-        if re.match(r'^- \[[ xX]\] ', original_line):
-            # If we're in options section, or if this is the first option after "**选项：**"
-            # (check previous lines for "**选项：**")
-            if in_options_section or (i > 0 and any('**选项：**' in lines[j] for j in range(max(0, i-5), i))):
-                if not in_options_section:
-                    in_options_section = True
-                    option_index = 0
-            if in_options_section:
-                # Extract option content
-                content = re.sub(r'^- \[[ xX]\] ', '', original_line).strip()
-                is_correct = '[x]' in original_line.lower() or '[X]' in original_line
-                
-                # Convert to ABCD (A=0, B=1, C=2, D=3, etc.)
-                option_letter = chr(ord('A') + option_index)
-                
-                p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Inches(0.3)
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                
-                run1 = p.add_run(f"{option_letter}. ")
-                run1.font.size = Pt(9.5)
-                run1.font.name = '宋体'
-                run1._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                
-                if is_correct:
-                    run1.font.bold = True
-                
-                # Process content (may contain images)
-                image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-                image_matches = list(re.finditer(image_pattern, content))
-                
-                if not image_matches:
-                    # No images, just add text
-                    run2 = p.add_run(content)
-                    run2.font.size = Pt(9.5)
-                    run2.font.name = '宋体'
-                    run2._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                    if is_correct:
-                        run2.font.bold = True
-                else:
-                    # Has images, process them
-                    last_pos = 0
-                    for img_match in image_matches:
-                        # Add text before image
-                        if img_match.start() > last_pos:
-                            text_part = content[last_pos:img_match.start()].strip()
-                            if text_part:
-                                run = p.add_run(text_part)
-                                run.font.size = Pt(9.5)
-                                run.font.name = '宋体'
-                                run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                                if is_correct:
-                                    run.font.bold = True
-                        
-                        # Process image
-                        img_url = img_match.group(2)
-                        img_alt = img_match.group(1) or ""
-                        
-                        # Download and insert image
-                        img_path = download_image(img_url, image_cache_dir)
-                        if img_path and img_path.exists():
-                            try:
-                                # Add image inline in the same paragraph
-                                run = p.add_run()
-                                run.add_picture(str(img_path), width=Inches(4))
-                            except Exception as e:
-                                print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
-                                # Add alt text as fallback
-                                run = p.add_run(f"[图片: {img_alt}]" if img_alt else "[图片]")
-                                run.font.size = Pt(9.5)
-                                run.font.name = '宋体'
-                                run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                        else:
-                            # Add alt text as fallback
-                            run = p.add_run(f"[图片加载失败: {img_alt}]" if img_alt else "[图片加载失败]")
-                            run.font.size = Pt(9.5)
-                            run.font.name = '宋体'
-                            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                        
-                        last_pos = img_match.end()
-                    
-                    # Add remaining text after last image
-                    if last_pos < len(content):
-                        text_part = content[last_pos:].strip()
-                        if text_part:
-                            run = p.add_run(text_part)
-                            run.font.size = Pt(9.5)
-                            run.font.name = '宋体'
-                            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                            if is_correct:
-                                run.font.bold = True
-                    
-                    # Add "(正确答案)" marker after images if this is the correct answer
-                    if is_correct:
-                        run = p.add_run(" （正确答案）")
-                        run.font.size = Pt(9.5)
-                        run.font.name = '宋体'
-                        run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                        run.font.bold = True
-                        run.font.color.rgb = RGBColor(0, 128, 0)  # Green color
-                
-                # Add "(正确答案)" marker for text-only options if this is the correct answer
-                if is_correct and not image_matches:
-                    run = p.add_run(" （正确答案）")
-                    run.font.size = Pt(9.5)
-                    run.font.name = '宋体'
-                    run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                    run.font.bold = True
-                    run.font.color.rgb = RGBColor(0, 128, 0)  # Green color
-                
-                option_index += 1
-                i += 1
-                continue
+            _add_run(p, bold_text, bold=True)
+            if rest_text:
+                _add_run(p, rest_text)
+        return True
+
+    # Any other bold line ends an options run
+    state['in_options_section'] = False
+    state['option_index'] = 0
+
+    # Bold text (like **题目：**, **标准答案：**, etc.)
+    parts = _split_bold(line)
+    if parts:
+        bold_text, rest_text = parts
+        if bold_text == '正确答案：':
+            return True
+        p = doc.add_paragraph()
+        _add_run(p, bold_text, bold=True)
+        if rest_text:
+            # Process rest_text which may contain images
+            image_matches = list(_IMAGE_RE.finditer(rest_text)) if '![' in rest_text else []
+
+            if not image_matches:
+                # No images, just add text
+                _add_run(p, rest_text)
+            else:
+                _render_inline_images(p, rest_text, image_matches, state)
+    return True
+
+
+def _handle_dash(line, original_line, doc, state):
+    """Render checkbox options, bullet list items, and horizontal rules."""
+    # Checkbox options - convert to ABCD format (only in options section)
+    # The prefix has a fixed "- [?] " shape, so plain string tests beat the regex engine here
+    is_checkbox = (
+        len(original_line) >= 6
+        and original_line[:3] == '- ['
+        and original_line[4:6] == '] '
+        and original_line[3] in ' xX'
+    )
+    if is_checkbox:
+        # If we're in options section, or if this is the first option after "**选项：**"
+        # (check the previous few lines for "**选项：**")
+        if state['in_options_section'] or any(state['recent_marker']):
+            if not state['in_options_section']:
+                state['in_options_section'] = True
+                state['option_index'] = 0
+        if state['in_options_section']:
+            # Extract option content
+            content = original_line[6:].strip()
+            is_correct = original_line[3] in 'xX'
+
+            # Convert to ABCD (A=0, B=1, C=2, D=3, etc.); past the 26
+            # precomputed prefixes, fall back to chr like the plain
+            # computation did rather than raising IndexError
+            option_index = state['option_index']
+            if option_index < len(_OPTION_PREFIXES):
+                prefix = _OPTION_PREFIXES[option_index]
+            else:
+                prefix = f"{chr(ord('A') + option_index)}. "
+
+            # Process content (may contain images)
+            image_matches = list(_IMAGE_RE.finditer(content)) if '![' in content else []
+
+            if not image_matches:
+                # No images: build the paragraph XML directly and append
+                # it to the body in one go
+                _append_option_paragraph(doc, prefix, content, is_correct)
             else:
-                # Not in options section, treat as regular list item
-                content = re.sub(r'^- \[[ xX]\] ', '', original_line).strip()
                 p = doc.add_paragraph()
-                p.paragraph_format.left_indent = Inches(0.2)
-                p.paragraph_format.space_before = Pt(0)
-                p.paragraph_format.space_after = Pt(0)
-                run = p.add_run(f"• {content}")
-                run.font.size = Pt(9.5)
-                run.font.name = '宋体'
-                run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                i += 1
-                continue
-        
-        # If we hit a non-option line after options, reset
-        if in_options_section and not re.match(r'^- \[[ xX]\] ', original_line):
-            in_options_section = False
-            option_index = 0
-        
-        # Bold text (like **题目：**, **标准答案：**, etc.)
-        if line.startswith('**'):
-            # Extract bold text and rest
-            match = re.match(r'\*\*(.+?)\*\*\s*(.*)', line)
-            if match:
-                bold_text = match.group(1)
-                if bold_text == '正确答案：':
-                    i += 1
-                    continue
-                rest_text = match.group(2)
+                p.paragraph_format.left_indent = _INDENT_OPTION
+                p.paragraph_format.space_before = _PT_0
+                p.paragraph_format.space_after = _PT_0
+
+                _add_run(p, prefix, bold=is_correct)
+                _render_inline_images(p, content, image_matches, state,
+                                      bold=is_correct, img_width=_IMG_WIDTH_4)
+
+                # Add "(正确答案)" marker after images if this is the correct answer
+                if is_correct:
+                    _add_run(p, " （正确答案）", bold=True, color=_GREEN)
+
+            state['option_index'] += 1
+            return True
+
+        # Not in options section, treat as regular list item
+        content = original_line[6:].strip()
+        p = doc.add_paragraph()
+        p.paragraph_format.left_indent = _INDENT_LIST
+        p.paragraph_format.space_before = _PT_0
+        p.paragraph_format.space_after = _PT_0
+        _add_run(p, f"• {content}")
+        return True
+
+    # A non-checkbox dash line ends an options run
+    state['in_options_section'] = False
+    state['option_index'] = 0
+
+    # List items (starting with -); line is already stripped
+    if line.startswith('- '):
+        content = line[2:]
+        p = doc.add_paragraph()
+        p.paragraph_format.left_indent = _INDENT_LIST
+        p.paragraph_format.space_before = _PT_0
+        p.paragraph_format.space_after = _PT_0
+        _add_run(p, f"• {content}")
+        return True
+
+    # Horizontal rule
+    if line.startswith('---'):
+        # Add minimal spacing instead of a line
+        return True
+
+    return False
+
+
+def _handle_text(line, original_line, doc, state):
+    """Render a plain text line, splitting out any inline images."""
+    # Most lines carry no image marker at all; a substring test skips
+    # both regex scans below for that common case
+    if '![' not in original_line:
+        _append_xml_paragraph(doc, _TEXT_P, line)
+        return
+
+    # Check for images in the line: ![alt](url)
+    image_matches = list(_IMAGE_RE.finditer(original_line))
+    if image_matches:
+        # Split line by images and process text/image parts
+        last_pos = 0
+
+        for img_match in image_matches:
+            # Add text before image
+            if img_match.start() > last_pos:
+                text_part = original_line[last_pos:img_match.start()].strip()
+                if text_part:
+                    p = doc.add_paragraph()
+                    p.paragraph_format.space_before = _PT_0
+                    p.paragraph_format.space_after = _PT_0
+                    _add_run(p, text_part)
+
+            # Process image
+            img_url = img_match.group(2)
+            img_alt = img_match.group(1) or ""
+
+            # Download image
+            img_path = _resolve_image(img_url, state)
+            if img_path and img_path.exists():
                 p = doc.add_paragraph()
-                run1 = p.add_run(bold_text)
-                run1.font.bold = True
-                run1.font.size = Pt(9.5)
-                run1.font.name = '宋体'
-                run1._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                if rest_text:
-                    # Process rest_text which may contain images
-                    image_pattern = r'!\[([^\]]*)\]\(([^)]+)\)'
-                    image_matches = list(re.finditer(image_pattern, rest_text))
-                    
-                    if not image_matches:
-                        # No images, just add text
-                        run2 = p.add_run(rest_text)
-                        run2.font.size = Pt(9.5)
-                        run2.font.name = '宋体'
-                        run2._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                    else:
-                        # Has images, process them
-                        last_pos = 0
-                        for img_match in image_matches:
-                            # Add text before image
-                            if img_match.start() > last_pos:
-                                text_part = rest_text[last_pos:img_match.start()].strip()
-                                if text_part:
-                                    run = p.add_run(text_part)
-                                    run.font.size = Pt(9.5)
-                                    run.font.name = '宋体'
-                                    run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                            
-                            # Process image
-                            img_url = img_match.group(2)
-                            img_alt = img_match.group(1) or ""
-                            
-                            # Download and insert image
-                            img_path = download_image(img_url, image_cache_dir)
-                            if img_path and img_path.exists():
-                                try:
-                                    # Add image inline in the same paragraph
-                                    run = p.add_run()
-                                    run.add_picture(str(img_path), width=Inches(5))
-                                except Exception as e:
-                                    print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
-                                    # Add alt text as fallback
-                                    run = p.add_run(f"[图片: {img_alt}]" if img_alt else "[图片]")
-                                    run.font.size = Pt(9.5)
-                                    run.font.name = '宋体'
-                                    run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                            else:
-                                # Add alt text as fallback
-                                run = p.add_run(f"[图片加载失败: {img_alt}]" if img_alt else "[图片加载失败]")
-                                run.font.size = Pt(9.5)
-                                run.font.name = '宋体'
-                                run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                            
-                            last_pos = img_match.end()
-                        
-                        # Add remaining text after last image
-                        if last_pos < len(rest_text):
-                            text_part = rest_text[last_pos:].strip()
-                            if text_part:
-                                run = p.add_run(text_part)
-                                run.font.size = Pt(9.5)
-                                run.font.name = '宋体'
-                                run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            i += 1
-            continue
-        
-        # List items (starting with -)
-        if line.startswith('- ') and not re.match(r'^- \[[ xX]\] ', original_line):
-            content = line[2:].strip()
-            p = doc.add_paragraph()
-            p.paragraph_format.left_indent = Inches(0.2)
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after = Pt(0)
-            run = p.add_run(f"• {content}")
-            run.font.size = Pt(9.5)
-            run.font.name = '宋体'
-            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            i += 1
-            continue
-        
-        # Horizontal rule
-        if line.startswith('---'):
-            # Add minimal spacing instead of a line
-            in_options_section = False
-            option_index = 0
-            i += 1
-            continue
-        
-        # Check for images in the line: ![alt](url)
-        image_matches = list(re.finditer(image_pattern, original_line))
-        if image_matches:
-            # Split line by images and process text/image parts
-            last_pos = 0
-            
-            for img_match in image_matches:
-                # Add text before image
-                if img_match.start() > last_pos:
-                    text_part = original_line[last_pos:img_match.start()].strip()
-                    if text_part:
-                        p = doc.add_paragraph()
-                        p.paragraph_format.space_before = Pt(0)
-                        p.paragraph_format.space_after = Pt(0)
-                        run = p.add_run(text_part)
-                        run.font.size = Pt(9.5)
-                        run.font.name = '宋体'
-                        run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                
-                # Process image
-                img_url = img_match.group(2)
-                img_alt = img_match.group(1) or ""
-                
-                # Download image
-                img_path = download_image(img_url, image_cache_dir)
-                if img_path and img_path.exists():
-                    try:
-                        p = doc.add_paragraph()
-                        p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-                        p.paragraph_format.space_before = Pt(4)
-                        p.paragraph_format.space_after = Pt(4)
-                        run = p.add_run()
-                        # Insert image with max width of 6 inches
-                        run.add_picture(str(img_path), width=Inches(6))
-                    except Exception as e:
-                        print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
-                        # Add alt text as fallback
-                        if img_alt:
-                            p = doc.add_paragraph()
-                            p.paragraph_format.space_before = Pt(0)
-                            p.paragraph_format.space_after = Pt(0)
-                            run = p.add_run(f"[图片: {img_alt}]")
-                            run.font.size = Pt(9.5)
-                            run.font.name = '宋体'
-                            run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                else:
+                p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+                p.paragraph_format.space_before = Pt(4)
+                p.paragraph_format.space_after = Pt(4)
+                try:
+                    # Insert image with max width of 6 inches
+                    _insert_picture(p, img_path, _IMG_WIDTH_6, state)
+                except Exception as e:
+                    print(f"  Warning: Failed to insert image {img_url}: {str(e)}")
+                    # Drop the speculative picture paragraph instead of leaving it empty
+                    p._element.getparent().remove(p._element)
                     # Add alt text as fallback
                     if img_alt:
                         p = doc.add_paragraph()
-                        p.paragraph_format.space_before = Pt(0)
-                        p.paragraph_format.space_after = Pt(0)
-                        run = p.add_run(f"[图片加载失败: {img_alt}]")
-                        run.font.size = Pt(9.5)
-                        run.font.name = '宋体'
-                        run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-                
-                last_pos = img_match.end()
-            
-            # Add remaining text after last image
-            if last_pos < len(original_line):
-                text_part = original_line[last_pos:].strip()
-                if text_part:
+                        p.paragraph_format.space_before = _PT_0
+                        p.paragraph_format.space_after = _PT_0
+                        _add_run(p, f"[图片: {img_alt}]")
+            else:
+                # Add alt text as fallback
+                if img_alt:
                     p = doc.add_paragraph()
-                    p.paragraph_format.space_before = Pt(0)
-                    p.paragraph_format.space_after = Pt(0)
-                    run = p.add_run(text_part)
-                    run.font.size = Pt(9.5)
-                    run.font.name = '宋体'
-                    run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-            
-            # If line was only images, we've already processed it
-            i += 1
+                    p.paragraph_format.space_before = _PT_0
+                    p.paragraph_format.space_after = _PT_0
+                    _add_run(p, f"[图片加载失败: {img_alt}]")
+
+            last_pos = img_match.end()
+
+        # Add remaining text after last image
+        if last_pos < len(original_line):
+            text_part = original_line[last_pos:].strip()
+            if text_part:
+                p = doc.add_paragraph()
+                p.paragraph_format.space_before = _PT_0
+                p.paragraph_format.space_after = _PT_0
+                _add_run(p, text_part)
+
+        # If line was only images, we've already processed it
+        return
+
+    # Safety check: strip any image markers that slipped past the block above
+    if _IMAGE_RE.search(line):
+        line = _IMAGE_RE.sub('', line).strip()
+        if not line:
+            return
+
+    # Regular text
+    _append_xml_paragraph(doc, _TEXT_P, line)
+
+
+# Dispatch table keyed by the first character of the stripped line; lines
+# whose handler declines (returns False) fall through to _handle_text
+_HANDLERS = {
+    '#': _handle_header,
+    '*': _handle_bold,
+    '-': _handle_dash,
+}
+
+
+def parse_markdown_to_docx(md_content: str, doc: Document, image_cache_dir: Optional[Path] = None,
+                           url_to_path: Optional[dict] = None):
+    """Parse Markdown content and add it to a DOCX document with compact formatting.
+
+    Each line is dispatched on its first character through _HANDLERS, so
+    regular text lines pay a single dict lookup instead of failing every
+    prefix check in turn.
+
+    Args:
+        md_content: Markdown content string
+        doc: python-docx Document object
+        image_cache_dir: Directory to cache downloaded images (optional)
+        url_to_path: Prefetched image URL to local path map (optional)
+    """
+    # Whether each of the five preceding lines carried the "**选项：**"
+    # marker; the checkbox handler checks any(recent_marker) instead of
+    # re-scanning the preceding lines with substring tests
+    recent_marker = deque(maxlen=5)
+
+    # Loop-carried parser state shared with the handlers
+    state = {
+        'in_options_section': False,
+        'option_index': 0,
+        'recent_marker': recent_marker,
+        'image_cache_dir': image_cache_dir,
+        'url_to_path': url_to_path if url_to_path is not None else {},
+        # Drawing XML per (path, width), plus a docPr id sequence for
+        # clones, started high to stay clear of python-docx's own ids
+        'picture_cache': {},
+        'picture_seq': 100000,
+    }
+
+    prev_line = None
+    for original_line in md_content.splitlines():
+        if prev_line is not None:
+            recent_marker.append('**选项：**' in prev_line)
+        prev_line = original_line
+
+        line = original_line.strip()
+
+        # Skip empty lines (we'll add minimal spacing manually)
+        # Don't reset in_options_section on empty lines - options may have empty lines between them
+        if not line:
             continue
-        
-        # Regular text (process text that may contain images inline, but already handled above)
-        # Check if line contains image markers but wasn't handled (shouldn't happen, but safety check)
-        if re.search(image_pattern, line):
-            # Remove image markers and process as text
-            line = re.sub(image_pattern, '', line).strip()
-            if not line:
-                i += 1
-                continue
-        
-        # Regular text
-        p = doc.add_paragraph()
-        p.paragraph_format.space_before = Pt(0)
-        p.paragraph_format.space_after = Pt(0)
-        run = p.add_run(line)
-        run.font.size = Pt(9.5)
-        run.font.name = '宋体'
-        run._element.rPr.rFonts.set(qn('w:eastAsia'), '宋体')
-        i += 1
 
+        handler = _HANDLERS.get(line[0])
+        if handler is not None and handler(line, original_line, doc, state):
+            continue
+
+        # Any other line ends an options run
+        if state['in_options_section']:
+            state['in_options_section'] = False
+            state['option_index'] = 0
+
+        _handle_text(line, original_line, doc, state)
 
-def convert_markdown_to_docx(md_file: Path, docx_file: Path, image_cache_dir: Optional[Path] = None):
+
+def convert_markdown_to_docx(md_file: Union[str, Path], docx_file: Union[str, Path],
+                             image_cache_dir: Optional[Path] = None):
     """Convert a single Markdown file to DOCX.
-    
+
     Args:
         md_file: Path to Markdown file
         docx_file: Path to output DOCX file
         image_cache_dir: Directory to cache downloaded images (optional)
     """
-    # Read Markdown content
-    with open(md_file, "r", encoding="utf-8") as f:
-        md_content = f.read()
-    
-    # Create new document
-    doc = Document()
-    
-    # Set page margins (compact)
-    sections = doc.sections
-    for section in sections:
-        section.top_margin = Inches(0.4)
-        section.bottom_margin = Inches(0.4)
-        section.left_margin = Inches(0.5)
-        section.right_margin = Inches(0.5)
-    
+    # Read Markdown content in one shot, skipping the buffered text layer
+    md_content = _read_markdown(md_file)
+
+    # Fetch all referenced images concurrently before the CPU-bound walk
+    url_to_path = _prefetch_images(md_content, image_cache_dir)
+
+    # Create new document from the pre-configured template
+    doc = Document(BytesIO(_TEMPLATE_BYTES))
+
     # Parse and add content (with image support)
-    parse_markdown_to_docx(md_content, doc, image_cache_dir=image_cache_dir)
-    
-    # Save document
-    doc.save(docx_file)
+    parse_markdown_to_docx(md_content, doc, image_cache_dir=image_cache_dir,
+                           url_to_path=url_to_path)
 
+    # Serialize in memory first so the output lands on disk in one write
+    # instead of the zip writer's many small ones
+    buf = BytesIO()
+    doc.save(buf)
+    with open(docx_file, 'wb') as f:
+        f.write(buf.getvalue())
 
-def main():
-    """Main function to convert Markdown files to DOCX."""
+
+def main(argv=None):
+    """Main function to convert Markdown files to DOCX.
+
+    Args:
+        argv: Argument list for in-process invocation (default: sys.argv)
+    """
     parser = argparse.ArgumentParser(
         description="Convert Markdown files to DOCX format"
     )
@@ -734,8 +1077,14 @@ def main():
         default=None,
         help="Directory to cache downloaded images (default: output/images)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of parallel conversion processes (default: CPU count)",
+    )
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Load courses from file if specified
     selected_courses = args.courses
@@ -744,8 +1093,7 @@ def main():
         courses_file = Path(args.courses_file)
         if courses_file.exists():
             try:
-                with open(courses_file, "r", encoding="utf-8") as f:
-                    selected_courses = json.load(f)
+                selected_courses = json.loads(courses_file.read_bytes())
             except Exception as e:
                 print(f"Failed to load courses file: {str(e)}")
                 selected_courses = None
@@ -766,25 +1114,29 @@ def main():
         return
     
     try:
-        # Find all Markdown files
+        # Find all Markdown files, skipping ones whose DOCX output already exists
         print("Scanning for Markdown files...")
-        courses_data = find_markdown_files(markdown_dir)
-        
-        if not courses_data:
+        courses_data, skipped_counts = find_markdown_files(markdown_dir, docx_dir)
+
+        if not courses_data and not skipped_counts:
             print("No Markdown files found")
             return
-        
+
         total_courses = len(courses_data)
         total_files = sum(len(files) for files in courses_data.values())
-        print(f"Found {total_courses} courses with {total_files} Markdown files")
-        
+        print(f"Found {total_courses} courses with {total_files} Markdown files to convert")
+
         # Filter by selected courses if specified
         if selected_courses:
             filtered_courses_data = {
                 name: files for name, files in courses_data.items()
                 if name in selected_courses
             }
-            if filtered_courses_data:
+            skipped_counts = {
+                name: count for name, count in skipped_counts.items()
+                if name in selected_courses
+            }
+            if filtered_courses_data or skipped_counts:
                 print(f"Processing {len(filtered_courses_data)} selected course(s): {', '.join(filtered_courses_data.keys())}")
                 courses_data = filtered_courses_data
             else:
@@ -799,52 +1151,66 @@ def main():
         print("=" * 60)
         
         total_exported = 0
-        total_skipped = 0
         total_errors = 0
-        
+        total_skipped = sum(skipped_counts.values())
+
+        # Build a flat list of conversion jobs; existing DOCX files were
+        # already filtered out during the scan
+        jobs = []
+        course_status = {
+            name: {"exported": 0, "skipped": count}
+            for name, count in skipped_counts.items()
+        }
         for course_name, markdown_files in courses_data.items():
             # Create course directory in DOCX output
             safe_course_name = course_name.replace("/", "_").replace("\\", "_")
             course_docx_dir = docx_dir / safe_course_name
             course_docx_dir.mkdir(parents=True, exist_ok=True)
-            
-            course_exported = 0
-            course_skipped = 0
-            
+
+            course_status.setdefault(course_name, {"exported": 0, "skipped": 0})
             for md_file in markdown_files:
+                docx_name = os.path.splitext(os.path.basename(md_file))[0] + ".docx"
+                jobs.append((course_name, md_file, os.path.join(course_docx_dir, docx_name)))
+
+        # Each file converts independently, so fan the jobs out across processes
+        workers = args.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    convert_markdown_to_docx, md_file, docx_file, image_cache_dir
+                ): (course_name, md_file)
+                for course_name, md_file, docx_file in jobs
+            }
+            for future in as_completed(futures):
+                course_name, md_file = futures[future]
                 try:
-                    # Generate DOCX filename
-                    docx_filename = md_file.stem + ".docx"
-                    docx_file = course_docx_dir / docx_filename
-                    
-                    # Skip if DOCX file already exists
-                    if docx_file.exists():
-                        course_skipped += 1
-                        total_skipped += 1
-                        continue
-                    
-                    # Convert to DOCX (with image support)
-                    convert_markdown_to_docx(md_file, docx_file, image_cache_dir=image_cache_dir)
-                    course_exported += 1
+                    future.result()
+                    course_status[course_name]["exported"] += 1
                     total_exported += 1
                 except Exception as e:
                     total_errors += 1
-                    print(f"  Failed to convert {md_file.name}: {str(e)}")
-            
-            status = f"{course_exported} exported"
-            if course_skipped > 0:
-                status += f", {course_skipped} skipped"
-            print(f"  {course_name}: {status}")
-        
-        print()
-        print("=" * 60)
-        print(f"   Total DOCX files exported: {total_exported}")
+                    print(f"  Failed to convert {os.path.basename(md_file)}: {str(e)}")
+
+        # Build the whole summary and emit it with a single write instead
+        # of taking the stdout lock once per line
+        summary = []
+        for course_name, counts in course_status.items():
+            status = f"{counts['exported']} exported"
+            if counts["skipped"] > 0:
+                status += f", {counts['skipped']} skipped"
+            summary.append(f"  {course_name}: {status}")
+
+        summary.append("")
+        summary.append("=" * 60)
+        summary.append(f"   Total DOCX files exported: {total_exported}")
         if total_skipped > 0:
-            print(f"   Total DOCX files skipped: {total_skipped} (already exist)")
+            summary.append(f"   Total DOCX files skipped: {total_skipped} (already exist)")
         if total_errors > 0:
-            print(f"   Errors: {total_errors}")
-        print(f"   DOCX files saved to: {docx_dir}")
-        print("=" * 60)
+            summary.append(f"   Errors: {total_errors}")
+        summary.append(f"   DOCX files saved to: {docx_dir}")
+        summary.append("=" * 60)
+        sys.stdout.write("\n".join(summary) + "\n")
+        sys.stdout.flush()
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
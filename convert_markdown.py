@@ -2,10 +2,53 @@
 
 import argparse
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from moocscript.markdown_exporter import export_course_to_markdown
 
+try:
+    # orjson parses several times faster than stdlib json; fall back
+    # silently when it isn't installed
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+def _load_paper_entry(candidate: tuple):
+    """Read and parse one paper JSON file into its papers-dict entry.
+
+    Args:
+        candidate: Tuple of (path, filename, paper_type, paper_name)
+
+    Returns:
+        Tuple of (paper_type, entry dict), or None when the file is not
+        a JSON object or fails to parse
+    """
+    path, name, paper_type, paper_name = candidate
+    try:
+        with open(path, "rb") as f:
+            paper_json = _loads(f.read())
+
+        # Verify JSON structure
+        if not isinstance(paper_json, dict):
+            return None
+
+        return paper_type, {
+            "name": paper_name,
+            "chapter_name": "",
+            "file": Path(path),
+            "data": paper_json,
+        }
+    except ValueError as e:
+        print(f"Failed to parse JSON {name}: {str(e)}")
+    except Exception as e:
+        print(f"Failed to read {name}: {str(e)}")
+    return None
+
 
 def find_json_files(json_dir: Path) -> dict:
     """Find all JSON files organized by course.
@@ -22,87 +65,85 @@ def find_json_files(json_dir: Path) -> dict:
         print(f"JSON directory not found: {json_dir}")
         return courses_data
     
-    # Iterate through course directories
-    for course_dir in json_dir.iterdir():
-        if not course_dir.is_dir():
-            continue
-        
-        course_name = course_dir.name
-        papers = {
-            "quiz": [],
-            "exam_objective": [],
-            "exam_subjective": [],
-            "homework": [],
-        }
-        
-        # Find all JSON files
-        for json_file in course_dir.glob("*.json"):
-            if json_file.name == "summary.json" or json_file.name == "selected_courses.json":
+    # Iterate through course directories with scandir so each entry's
+    # cached d_type is reused instead of issuing a stat per file.  A single
+    # thread pool is shared across courses to parallelize file loading.
+    with ThreadPoolExecutor(max_workers=16) as pool, os.scandir(json_dir) as it:
+        for course_entry in it:
+            if not course_entry.is_dir(follow_symlinks=False):
                 continue
+
+            course_name = course_entry.name
+            papers = {
+                "quiz": [],
+                "exam_objective": [],
+                "exam_subjective": [],
+                "homework": [],
+            }
+            candidates = []
+
+            # Find all JSON files, filtering by name before any stat or
+            # Path construction happens
+            with os.scandir(course_entry.path) as course_it:
+                for file_entry in course_it:
+                    name = file_entry.name
+                    if (
+                        not name.endswith(".json")
+                        or name == "summary.json"
+                        or name == "selected_courses.json"
+                        or not file_entry.is_file(follow_symlinks=False)
+                    ):
+                        continue
+
+                    # Parse filename: {type}_{name}_{id}.json
+                    # Handle special cases: exam_objective, exam_subjective
+                    stem = name[:-5]
+                    paper_type = None
+                    paper_name = None
             
-            # Parse filename: {type}_{name}_{id}.json
-            # Handle special cases: exam_objective, exam_subjective
-            stem = json_file.stem
-            paper_type = None
-            paper_name = None
-            
-            # Check for exam_objective or exam_subjective first
-            if stem.startswith("exam_objective_"):
-                paper_type = "exam_objective"
-                paper_name = stem[len("exam_objective_"):]
-            elif stem.startswith("exam_subjective_"):
-                paper_type = "exam_subjective"
-                paper_name = stem[len("exam_subjective_"):]
-            else:
-                # Regular format: {type}_{name}_{id}.json
-                name_parts = stem.split("_", 2)
-                if len(name_parts) >= 2:
-                    paper_type = name_parts[0]
-                    paper_name = "_".join(name_parts[1:])
-                else:
-                    paper_type = "unknown"
-                    paper_name = stem
+                    # Check for exam_objective or exam_subjective first
+                    if stem.startswith("exam_objective_"):
+                        paper_type = "exam_objective"
+                        paper_name = stem[len("exam_objective_"):]
+                    elif stem.startswith("exam_subjective_"):
+                        paper_type = "exam_subjective"
+                        paper_name = stem[len("exam_subjective_"):]
+                    else:
+                        # Regular format: {type}_{name}_{id}.json
+                        name_parts = stem.split("_", 2)
+                        if len(name_parts) >= 2:
+                            paper_type = name_parts[0]
+                            paper_name = "_".join(name_parts[1:])
+                        else:
+                            paper_type = "unknown"
+                            paper_name = stem
             
-            # Remove test_id suffix if present (format: name_id)
-            # Test if paper_name ends with a number pattern
-            if paper_name:
-                # Try to split by last underscore to remove test_id
-                name_parts = paper_name.rsplit("_", 1)
-                if len(name_parts) == 2:
-                    # Check if last part is numeric (test_id)
-                    try:
-                        int(name_parts[1])
-                        paper_name = name_parts[0]  # Remove test_id
-                    except ValueError:
-                        pass  # Not a test_id, keep as is
+                    # Remove test_id suffix if present (format: name_id)
+                    # Test if paper_name ends with a number pattern
+                    if paper_name:
+                        # Try to split by last underscore to remove test_id
+                        name_parts = paper_name.rsplit("_", 1)
+                        if len(name_parts) == 2:
+                            # Check if last part is numeric (test_id)
+                            try:
+                                int(name_parts[1])
+                                paper_name = name_parts[0]  # Remove test_id
+                            except ValueError:
+                                pass  # Not a test_id, keep as is
             
-            # Try to extract chapter name from JSON content
-            try:
-                with open(json_file, "r", encoding="utf-8") as f:
-                    paper_json = json.load(f)
-                
-                # Verify JSON structure
-                if not isinstance(paper_json, dict):
-                    continue
-                
-                # Try to get chapter name from file path or metadata
-                chapter_name = ""
-                
-                # Only add if paper_type is valid
-                if paper_type in papers:
-                    papers[paper_type].append({
-                        "name": paper_name,
-                        "chapter_name": chapter_name,
-                        "file": json_file,
-                        "data": paper_json,
-                    })
-            except json.JSONDecodeError as e:
-                print(f"Failed to parse JSON {json_file.name}: {str(e)}")
-            except Exception as e:
-                print(f"Failed to read {json_file.name}: {str(e)}")
-        
-        if any(papers.values()):
-            courses_data[course_name] = papers
+                    # Only queue files with a valid paper type
+                    if paper_type in papers:
+                        candidates.append((file_entry.path, name, paper_type, paper_name))
+
+            # Read and parse the queued files concurrently; reads overlap
+            # in the thread pool while the GIL serializes only the parse
+            if candidates:
+                for result in pool.map(_load_paper_entry, candidates):
+                    if result is not None:
+                        papers[result[0]].append(result[1])
+
+            if any(papers.values()):
+                courses_data[course_name] = papers
     
     return courses_data
 
@@ -126,8 +167,12 @@ def load_summary(json_dir: Path) -> dict:
     return {}
 
 
-def main():
-    """Main function to convert JSON files to Markdown."""
+def main(argv=None):
+    """Main function to convert JSON files to Markdown.
+
+    Args:
+        argv: Argument list for in-process invocation (default: sys.argv)
+    """
     parser = argparse.ArgumentParser(
         description="Convert JSON files to Markdown format"
     )
@@ -156,8 +201,8 @@ def main():
         help="JSON file containing list of course names to process",
     )
     
-    args = parser.parse_args()
-    
+    args = parser.parse_args(argv)
+
     # Load courses from file if specified
     selected_courses = args.courses
     if args.courses_file:
@@ -224,6 +269,9 @@ def main():
         
         total_skipped = 0
         
+        # Collect per-course status lines and write the summary in one go
+        # instead of taking the stdout lock once per line
+        summary = []
         for course_name, papers in courses_data.items():
             try:
                 exported, skipped = export_course_to_markdown(
@@ -236,20 +284,22 @@ def main():
                 status = f"{exported} exported"
                 if skipped > 0:
                     status += f", {skipped} skipped"
-                print(f"  {course_name}: {status}")
+                summary.append(f"  {course_name}: {status}")
             except Exception as e:
                 total_errors += 1
-                print(f"  {course_name}: Failed - {str(e)}")
-        
-        print()
-        print("=" * 60)
-        print(f"   Total papers exported: {total_exported}")
+                summary.append(f"  {course_name}: Failed - {str(e)}")
+
+        summary.append("")
+        summary.append("=" * 60)
+        summary.append(f"   Total papers exported: {total_exported}")
         if total_skipped > 0:
-            print(f"   Total papers skipped: {total_skipped} (already exist)")
+            summary.append(f"   Total papers skipped: {total_skipped} (already exist)")
         if total_errors > 0:
-            print(f"   Errors: {total_errors}")
-        print(f"   Markdown files saved to: {markdown_dir}")
-        print("=" * 60)
+            summary.append(f"   Errors: {total_errors}")
+        summary.append(f"   Markdown files saved to: {markdown_dir}")
+        summary.append("=" * 60)
+        sys.stdout.write("\n".join(summary) + "\n")
+        sys.stdout.flush()
     
     except KeyboardInterrupt:
         print("\n\nInterrupted by user")
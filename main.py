@@ -1,34 +1,37 @@
 """Example usage of MoocForge API client."""
 
-import json
+from dataclasses import fields, is_dataclass
 from pathlib import Path
 
 from moocscript import APIConfig, MOOCClient
+from moocscript.jsonio import atomic_write_json
 
 
-def save_to_json(data: dict, filename: str):
+def _json_default(obj):
+    """Encoder hook for objects the JSON encoder cannot handle natively.
+
+    Exposing the fields of Result/Status (slotted dataclasses) or any
+    object's __dict__ lets the encoder walk the response graph in place
+    during its single pass, instead of pre-converting it into throwaway
+    dicts first.
+    """
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if hasattr(obj, "__dict__"):
+        return obj.__dict__
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def save_to_json(data, filename: str):
     """Save data to JSON file with pretty formatting."""
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
 
     filepath = output_dir / filename
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    atomic_write_json(filepath, data, default=_json_default)
     print(f"Saved: {filepath}")
 
 
-def dict_to_json_serializable(obj):
-    """Convert objects to JSON serializable format."""
-    if hasattr(obj, "__dict__"):
-        return {k: dict_to_json_serializable(v) for k, v in obj.__dict__.items()}
-    elif isinstance(obj, dict):
-        return {k: dict_to_json_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [dict_to_json_serializable(item) for item in obj]
-    else:
-        return obj
-
-
 def main():
     """Main example function."""
     # Initialize client
@@ -43,9 +46,7 @@ def main():
         courses_result = client.get_course_list(page=1, page_size=20)
 
         if courses_result.status.code == 0:
-            save_to_json(
-                dict_to_json_serializable(courses_result.__dict__), "course_list.json"
-            )
+            save_to_json(courses_result, "course_list.json")
 
             # Extract courses if available
             results = courses_result.results
@@ -62,10 +63,7 @@ def main():
                 course_info_result = client.get_course_info(course_id, term_id)
 
                 if course_info_result.status.code == 0:
-                    save_to_json(
-                        dict_to_json_serializable(course_info_result.__dict__),
-                        "course_info.json",
-                    )
+                    save_to_json(course_info_result, "course_info.json")
 
                     # Example 3: Check and get homework if available
                     term_dto = course_info_result.results.get("termDto", {})
@@ -91,10 +89,7 @@ def main():
                         homework_result = client.get_homework(term_id)
 
                         if homework_result.status.code == 0:
-                            save_to_json(
-                                dict_to_json_serializable(homework_result.__dict__),
-                                "homework.json",
-                            )
+                            save_to_json(homework_result, "homework.json")
                         else:
                             print(
                                 f"Failed to get homework: {homework_result.status.message}"
@@ -122,10 +117,7 @@ def main():
                         quiz_result = client.get_test_detail(quiz_content_id)
 
                         if quiz_result.status.code == 0:
-                            save_to_json(
-                                dict_to_json_serializable(quiz_result.__dict__),
-                                "quiz.json",
-                            )
+                            save_to_json(quiz_result, "quiz.json")
                         else:
                             print(f"Failed to get quiz: {quiz_result.status.message}")
                     else:
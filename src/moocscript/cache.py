@@ -0,0 +1,91 @@
+"""Disk-backed cache for MOOC API responses."""
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from moocscript.jsonio import atomic_write_json, load_json_bytes
+
+# Upstream data rarely changes intraday; six hours keeps repeated runs
+# local while still picking up new papers the same day
+DEFAULT_TTL = 6 * 3600.0
+
+# Per-endpoint overrides at the default TTL: paper contents are
+# effectively static once published, while the course list is the one
+# endpoint that gains new entries and should go stale quickly. These
+# scale with the requested TTL so --cache-ttl governs every endpoint,
+# not just the unlisted ones.
+ENDPOINT_TTLS = {
+    "mob/course/paperDetail/v1": 7 * 24 * 3600.0,
+    "mob/course/getAllMyCourseList/v2": 10 * 60.0,
+}
+
+
+class ResponseCache:
+    """File-per-entry response cache with a freshness TTL.
+
+    Entries are keyed by a hash of (endpoint, query params) and stored
+    as plain JSON files, so repeated fetch runs against unchanged
+    courses read from disk instead of the network. The mob-token is
+    part of the query and therefore of the key, which keeps responses
+    from different accounts apart.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path],
+        ttl: float = DEFAULT_TTL,
+        endpoint_ttls: Optional[Dict[str, float]] = None,
+    ):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for cache entries (created if missing)
+            ttl: Default entry lifetime in seconds
+            endpoint_ttls: Per-endpoint lifetime overrides
+                (default: ENDPOINT_TTLS scaled by ttl / DEFAULT_TTL)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        if endpoint_ttls is None:
+            # Keep the overrides proportional to the requested default:
+            # --cache-ttl 3 (half the default) also halves the paper and
+            # course-list lifetimes instead of silently ignoring the flag
+            # for the two endpoints that matter most
+            scale = ttl / DEFAULT_TTL
+            endpoint_ttls = {
+                endpoint: endpoint_ttl * scale
+                for endpoint, endpoint_ttl in ENDPOINT_TTLS.items()
+            }
+        self.endpoint_ttls = endpoint_ttls
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, endpoint: str, query: Dict[str, Any]) -> Path:
+        key = json.dumps([endpoint, query], sort_keys=True, ensure_ascii=False)
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{digest}.json"
+
+    def get(self, endpoint: str, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for a request, or None.
+
+        Misses, expired entries, and unreadable files all report None so
+        the caller simply falls through to the network.
+        """
+        path = self._entry_path(endpoint, query)
+        ttl = self.endpoint_ttls.get(endpoint, self.ttl)
+        try:
+            if time.time() - path.stat().st_mtime > ttl:
+                return None
+            return load_json_bytes(path.read_bytes())
+        except (OSError, ValueError):
+            return None
+
+    def set(self, endpoint: str, query: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Store a response. Write failures are ignored; the cache is
+        an optimization, never a requirement."""
+        try:
+            atomic_write_json(self._entry_path(endpoint, query), data, compact=True)
+        except OSError:
+            pass
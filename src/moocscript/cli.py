@@ -0,0 +1,60 @@
+"""Shared command-line helpers for the fetch script entry points."""
+
+import argparse
+
+
+def make_fetch_parser(
+    description: str,
+    convert_flags: bool = False,
+) -> argparse.ArgumentParser:
+    """Build the argument parser shared by fetch_json.py and fetch_all.py.
+
+    Args:
+        description: Parser description text
+        convert_flags: Also add the --skip-markdown/--skip-docx flags
+
+    Returns:
+        Configured ArgumentParser
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        "--output",
+        type=str,
+        default="output",
+        help="Output directory (default: output)",
+    )
+    parser.add_argument(
+        "--token",
+        type=str,
+        default=None,
+        help="MOOC mob token (overrides environment variable)",
+    )
+    if convert_flags:
+        parser.add_argument(
+            "--skip-markdown",
+            action="store_true",
+            help="Skip Markdown conversion (only fetch JSON)",
+        )
+        parser.add_argument(
+            "--skip-docx",
+            action="store_true",
+            help="Skip DOCX conversion (only fetch JSON and convert to Markdown)",
+        )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Download all courses without interactive selection",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always fetch from the network, bypassing the response cache",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        default=6.0,
+        help="Response cache freshness in hours (default: 6); "
+        "per-endpoint lifetimes scale proportionally",
+    )
+    return parser
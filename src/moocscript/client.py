@@ -2,22 +2,35 @@
 
 from typing import Optional
 
+from moocscript.cache import ResponseCache
 from moocscript.config import APIConfig
 from moocscript.models import Result
 from moocscript.request import RequestClient
 
+# get_test_detail is the hottest endpoint in the fetch loop and is
+# almost always called with the defaults; prebuild that query tail
+_TEST_DETAIL_DEFAULT_QUERY = {
+    "isExercise": "true",
+    "withStdAnswerAndAnalyse": "true",
+}
+
 
 class MOOCClient:
     """Main client for interacting with MOOC API."""
     
-    def __init__(self, config: Optional[APIConfig] = None):
+    def __init__(
+        self,
+        config: Optional[APIConfig] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
         """Initialize MOOC client.
         
         Args:
             config: API configuration. If None, creates default config.
+            cache: Optional on-disk response cache shared by all requests
         """
         self.config = config or APIConfig()
-        self._request_client = RequestClient(self.config)
+        self._request_client = RequestClient(self.config, cache=cache)
     
     def get_course_list(
         self,
@@ -104,14 +117,18 @@ class MOOCClient:
         Returns:
             Result containing test paper data
         """
-        return self._request_client.request(
-            endpoint="mob/course/paperDetail/v1",
-            method="POST",
-            query={
+        if is_exercise and with_std_answer_and_analyse:
+            query = {"testId": test_id, **_TEST_DETAIL_DEFAULT_QUERY}
+        else:
+            query = {
                 "testId": test_id,
                 "isExercise": "true" if is_exercise else "false",
                 "withStdAnswerAndAnalyse": "true" if with_std_answer_and_analyse else "false",
-            },
+            }
+        return self._request_client.request(
+            endpoint="mob/course/paperDetail/v1",
+            method="POST",
+            query=query,
         )
     
     def close(self):
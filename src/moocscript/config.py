@@ -1,8 +1,22 @@
 """Configuration management for MoocForge API client."""
 
+import types
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Dict
 
+# Default headers, built once at import; MappingProxyType keeps the
+# template itself immutable while each config still gets its own
+# mutable copy to customize
+_DEFAULT_HEADERS = types.MappingProxyType({
+    "edu-app-type": "android",
+    "User-Agent": "Mozilla/5.0 (Linux; Android 10; SM-G975F) AppleWebKit/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+    "Referer": "https://www.icourse163.org/",
+    "Content-Type": "application/json",
+})
+
 
 @dataclass
 class APIConfig:
@@ -13,25 +27,24 @@ class APIConfig:
         mob_token: Authentication token (can be empty, set via environment or later)
         headers: HTTP headers to include in requests
         timeout: Request timeout in seconds
+        rate_limit: Maximum requests per second across all threads
+            (0 disables rate limiting)
     """
     
     base_url: str = "https://www.icourse163.org/"
     mob_token: str = ""
     timeout: int = 30
-    headers: Dict[str, str] = field(default_factory=lambda: {
-        "edu-app-type": "android",
-        "User-Agent": "Mozilla/5.0 (Linux; Android 10; SM-G975F) AppleWebKit/537.36",
-        "Accept": "application/json, text/plain, */*",
-        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-        "Referer": "https://www.icourse163.org/",
-        "Content-Type": "application/json",
-    })
+    rate_limit: float = 8.0
+    headers: Dict[str, str] = field(default_factory=lambda: dict(_DEFAULT_HEADERS))
     
     @classmethod
+    @lru_cache(maxsize=1)
     def from_env(cls) -> "APIConfig":
         """Create configuration from environment variables.
-        
-        Reads MOOC_MOB_TOKEN from environment if available.
+
+        Reads MOOC_MOB_TOKEN from environment if available. The result
+        is cached: the environment does not change within a process, so
+        repeated calls share one config.
         """
         import os
         mob_token = os.getenv("MOOC_MOB_TOKEN", "")
@@ -1,27 +1,81 @@
 """Data fetcher for retrieving all course papers."""
 
-import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 from moocscript.client import MOOCClient
+from moocscript.jsonio import atomic_write_json, load_json_bytes
+
+# Concurrent course fetches; the work is latency-bound so a handful of
+# threads saturates it without hammering the API
+_FETCH_WORKERS = 8
+
+# Concurrent paper fetches within one course (multiplies with the course
+# pool, so keep it small)
+_PAPER_WORKERS = 4
+
+# Per-type bookkeeping: statistics counter and the ID key used in the
+# papers entry (quizzes/homeworks carry contentId, exams a test ID)
+_PAPER_STATS = {
+    "quiz": "quizzes",
+    "exam_objective": "exams_objective",
+    "exam_subjective": "exams_subjective",
+    "homework": "homeworks",
+}
+_PAPER_ID_KEY = {
+    "quiz": "content_id",
+    "exam_objective": "test_id",
+    "exam_subjective": "test_id",
+    "homework": "content_id",
+}
+
+
+# Filesystem-hostile characters mapped to "_" in one translate pass;
+# covers the Windows-forbidden set beyond the old "/" and "\\" pair
+_SANITIZE = str.maketrans({c: "_" for c in '/\\:*?"<>|'})
+
+
+def _as_dict(value: Any) -> Dict[str, Any]:
+    """Return value if it is a dict, else an empty dict."""
+    return value if isinstance(value, dict) else {}
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Return value if it is a list, else an empty list."""
+    return value if isinstance(value, list) else []
 
 
 class CourseFetcher:
     """Fetcher for retrieving all course data including quizzes and exams."""
 
-    def __init__(self, client: MOOCClient, output_dir: Path):
+    def __init__(
+        self,
+        client: MOOCClient,
+        output_dir: Path,
+        reuse_existing: bool = True,
+    ):
         """Initialize fetcher.
 
         Args:
             client: MOOC API client
             output_dir: Directory to save JSON files
+            reuse_existing: Load papers already saved by a previous run
+                from disk instead of re-fetching them
         """
         self.client = client
         self.output_dir = Path(output_dir)
+        self.reuse_existing = reuse_existing
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Statistics
+        # Course directories already created, so each of a course's many
+        # paper saves doesn't re-issue the mkdir syscalls
+        self._made_dirs = set()
+
+        # Statistics (guarded by a lock since courses fetch in parallel)
+        self._stats_lock = threading.Lock()
         self.stats = {
             "courses": 0,
             "quizzes": 0,
@@ -31,6 +85,17 @@ class CourseFetcher:
             "errors": 0,
         }
 
+    def _count(self, key: str) -> None:
+        """Increment a statistics counter under the lock."""
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _count_many(self, counts: Dict[str, int]) -> None:
+        """Apply a batch of counter increments under one lock acquisition."""
+        with self._stats_lock:
+            for key, n in counts.items():
+                self.stats[key] += n
+
     def fetch_all_courses(self, page_size: int = 20) -> List[Dict[str, Any]]:
         """Fetch all courses from all pages.
 
@@ -121,7 +186,7 @@ class CourseFetcher:
 
             if result.status.code != 0:
                 print(f"    Failed to fetch {paper_name}: {result.status.message}")
-                self.stats["errors"] += 1
+                self._count("errors")
                 return None
 
             return {
@@ -133,7 +198,7 @@ class CourseFetcher:
             }
         except Exception as e:
             print(f"    Error fetching {paper_name}: {str(e)}")
-            self.stats["errors"] += 1
+            self._count("errors")
             return None
 
     def save_paper_json(
@@ -142,6 +207,7 @@ class CourseFetcher:
         course_name: str,
         paper_name: str,
         paper_type: str,
+        course_dir: Optional[Path] = None,
     ) -> Path:
         """Save paper data to JSON file.
 
@@ -150,17 +216,22 @@ class CourseFetcher:
             course_name: Name of the course
             paper_name: Name of the paper
             paper_type: Type of paper
+            course_dir: Course output directory, if the caller already
+                resolved it (saves recomputing it per paper)
 
         Returns:
             Path to saved file
         """
-        # Create course directory
-        safe_course_name = course_name.replace("/", "_").replace("\\", "_")
-        course_dir = self.output_dir / "json" / safe_course_name
-        course_dir.mkdir(parents=True, exist_ok=True)
+        # Create course directory on first use only
+        if course_dir is None:
+            safe_course_name = course_name.translate(_SANITIZE)
+            course_dir = self.output_dir / "json" / safe_course_name
+        if course_dir.name not in self._made_dirs:
+            course_dir.mkdir(parents=True, exist_ok=True)
+            self._made_dirs.add(course_dir.name)
 
         # Sanitize filename
-        safe_paper_name = paper_name.replace("/", "_").replace("\\", "_")
+        safe_paper_name = paper_name.translate(_SANITIZE)
         # Get testId if available, otherwise omit it
         test_id = paper_data.get('results', {}).get('mocPaperDto', {}).get('testId')
         if test_id:
@@ -170,11 +241,44 @@ class CourseFetcher:
 
         filepath = course_dir / filename
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(paper_data, f, ensure_ascii=False, indent=2)
+        # Papers are bulk machine-read output (the converters json.load
+        # them); compact encoding writes ~3x fewer bytes than indented
+        atomic_write_json(filepath, paper_data, compact=True)
 
         return filepath
 
+    def _existing_paper_path(
+        self,
+        course_dir: Path,
+        existing_files: Set[str],
+        paper_type: str,
+        paper_name: str,
+    ) -> Optional[Path]:
+        """Find a paper file saved by a previous run, or None.
+
+        save_paper_json names files {type}_{name}_{testId}.json (or
+        without the ID when the response carries none); the test ID is
+        unknown before fetching, so match on the deterministic prefix.
+        """
+        if not existing_files:
+            return None
+        safe_paper_name = paper_name.translate(_SANITIZE)
+        exact = f"{paper_type}_{safe_paper_name}.json"
+        if exact in existing_files:
+            return course_dir / exact
+        prefix = f"{paper_type}_{safe_paper_name}_"
+        for name in existing_files:
+            # Only a numeric test ID may follow the prefix; anything else
+            # is a different paper whose name extends this one (e.g.
+            # "期末考试" must not match "期末考试_补考_456.json")
+            if (
+                name.startswith(prefix)
+                and name.endswith(".json")
+                and name[len(prefix):-5].isdigit()
+            ):
+                return course_dir / name
+        return None
+
     def fetch_all_papers_for_course(
         self,
         course: Dict[str, Any],
@@ -190,12 +294,8 @@ class CourseFetcher:
             Dictionary with lists of paper info
         """
         course_name = course.get("name", "Unknown")
-        term_dto = course_info.get("termDto") or {}
-        if not isinstance(term_dto, dict):
-            term_dto = {}
-        chapters = term_dto.get("chapters") or []
-        if not isinstance(chapters, list):
-            chapters = []
+        term_dto = _as_dict(course_info.get("termDto"))
+        chapters = _as_list(term_dto.get("chapters"))
 
         papers = {
             "quiz": [],
@@ -207,16 +307,30 @@ class CourseFetcher:
         print(f"\nProcessing course: {course_name}")
         print(f"  Chapters: {len(chapters)}")
 
+        # Resolve the course directory once and list what a previous run
+        # already saved, so interrupted fetches resume where they stopped
+        safe_course_name = course_name.translate(_SANITIZE)
+        course_dir = self.output_dir / "json" / safe_course_name
+        existing_files: Set[str] = set()
+        if self.reuse_existing:
+            try:
+                with os.scandir(course_dir) as it:
+                    existing_files = {entry.name for entry in it}
+            except FileNotFoundError:
+                pass
+
+        # Walk the chapter tree first and queue every paper; the HTTP
+        # round-trips then overlap on a small pool over the keep-alive
+        # session instead of costing one RTT each in sequence
+        tasks = []  # (paper_type, chapter_name, paper_id, paper_name, cached_path)
+
         for chapter in chapters:
             if not isinstance(chapter, dict):
                 continue
             chapter_name = chapter.get("name", "Unknown")
 
-            # Fetch quizzes
-            quizs = chapter.get("quizs") or []
-            if not isinstance(quizs, list):
-                quizs = []
-            for quiz in quizs:
+            # Queue quizzes
+            for quiz in _as_list(chapter.get("quizs")):
                 if not isinstance(quiz, dict):
                     continue
                 quiz_name = quiz.get("name", "Unknown")
@@ -225,90 +339,54 @@ class CourseFetcher:
                 if not content_id:
                     continue
 
-                print(f"  Fetching quiz: {quiz_name} (ID: {content_id})")
-                paper_data = self.fetch_paper(content_id, quiz_name, "quiz")
+                cached = self._existing_paper_path(
+                    course_dir, existing_files, "quiz", quiz_name
+                )
+                verb = "Reusing saved" if cached else "Fetching"
+                print(f"  {verb} quiz: {quiz_name} (ID: {content_id})")
+                tasks.append(("quiz", chapter_name, content_id, quiz_name, cached))
 
-                if paper_data:
-                    filepath = self.save_paper_json(
-                        paper_data, course_name, quiz_name, "quiz"
-                    )
-                    papers["quiz"].append(
-                        {
-                            "name": quiz_name,
-                            "chapter_name": chapter_name,
-                            "content_id": content_id,
-                            "file": filepath,
-                            "data": paper_data,
-                        }
-                    )
-                    self.stats["quizzes"] += 1
-
-            # Fetch exams
-            exam = chapter.get("exam")
-            if exam and isinstance(exam, dict):
+            # Queue exams
+            exam = _as_dict(chapter.get("exam"))
+            if exam:
                 # Objective exam
-                object_test = exam.get("objectTestVo")
-                if object_test and isinstance(object_test, dict):
+                object_test = _as_dict(exam.get("objectTestVo"))
+                if object_test:
                     exam_id = object_test.get("id")
                     exam_name = object_test.get("name", "客观题考试")
 
                     if exam_id:
+                        cached = self._existing_paper_path(
+                            course_dir, existing_files, "exam_objective", exam_name
+                        )
+                        verb = "Reusing saved" if cached else "Fetching"
                         print(
-                            f"  Fetching objective exam: {exam_name} (ID: {exam_id})"
+                            f"  {verb} objective exam: {exam_name} (ID: {exam_id})"
                         )
-                        paper_data = self.fetch_paper(
-                            exam_id, exam_name, "exam_objective"
+                        tasks.append(
+                            ("exam_objective", chapter_name, exam_id, exam_name, cached)
                         )
 
-                        if paper_data:
-                            filepath = self.save_paper_json(
-                                paper_data, course_name, exam_name, "exam_objective"
-                            )
-                            papers["exam_objective"].append(
-                                {
-                                    "name": exam_name,
-                                    "chapter_name": chapter_name,
-                                    "test_id": exam_id,
-                                    "file": filepath,
-                                    "data": paper_data,
-                                }
-                            )
-                            self.stats["exams_objective"] += 1
-
                 # Subjective exam
-                subject_test = exam.get("subjectTestVo")
-                if subject_test and isinstance(subject_test, dict):
+                subject_test = _as_dict(exam.get("subjectTestVo"))
+                if subject_test:
                     exam_id = subject_test.get("id")
                     exam_name = subject_test.get("name", "主观题考试")
 
                     if exam_id:
+                        cached = self._existing_paper_path(
+                            course_dir, existing_files, "exam_subjective", exam_name
+                        )
+                        verb = "Reusing saved" if cached else "Fetching"
                         print(
-                            f"  Fetching subjective exam: {exam_name} (ID: {exam_id})"
+                            f"  {verb} subjective exam: {exam_name} (ID: {exam_id})"
                         )
-                        paper_data = self.fetch_paper(
-                            exam_id, exam_name, "exam_subjective"
+                        tasks.append(
+                            ("exam_subjective", chapter_name, exam_id, exam_name, cached)
                         )
 
-                        if paper_data:
-                            filepath = self.save_paper_json(
-                                paper_data, course_name, exam_name, "exam_subjective"
-                            )
-                            papers["exam_subjective"].append(
-                                {
-                                    "name": exam_name,
-                                    "chapter_name": chapter_name,
-                                    "test_id": exam_id,
-                                    "file": filepath,
-                                    "data": paper_data,
-                                }
-                            )
-                            self.stats["exams_subjective"] += 1
-
-            # Fetch homeworks
-            homeworks = chapter.get("homeworks") or []
-            if not isinstance(homeworks, list):
-                homeworks = []
-            for homework in homeworks:
+            # Queue homeworks
+            for homework in _as_list(chapter.get("homeworks")):
                 if not isinstance(homework, dict):
                     continue
                 homework_name = homework.get("name", "Unknown")
@@ -317,23 +395,89 @@ class CourseFetcher:
                 if not content_id:
                     continue
 
-                print(f"  Fetching homework: {homework_name} (ID: {content_id})")
-                paper_data = self.fetch_paper(content_id, homework_name, "homework")
+                cached = self._existing_paper_path(
+                    course_dir, existing_files, "homework", homework_name
+                )
+                verb = "Reusing saved" if cached else "Fetching"
+                print(f"  {verb} homework: {homework_name} (ID: {content_id})")
+                tasks.append(
+                    ("homework", chapter_name, content_id, homework_name, cached)
+                )
+
+        if not tasks:
+            return papers
+
+        def load_or_fetch(task):
+            """Serve a queued paper from disk when possible, else fetch."""
+            paper_type, _chapter, paper_id, paper_name, cached_path = task
+            if cached_path is not None:
+                try:
+                    return load_json_bytes(cached_path.read_bytes()), cached_path
+                except (OSError, ValueError):
+                    pass  # unreadable leftovers fall through to the network
+            return self.fetch_paper(paper_id, paper_name, paper_type), None
+
+        # The same paper can be linked from several chapters (shared
+        # review exams); fetch each unique ID once and fan the result
+        # back out to every chapter that referenced it
+        unique_index = {}  # (paper_type, paper_id) -> slot in unique_tasks
+        unique_tasks = []
+        task_slots = []
+        for task in tasks:
+            key = (task[0], task[2])
+            slot = unique_index.get(key)
+            if slot is None:
+                slot = len(unique_tasks)
+                unique_index[key] = slot
+                unique_tasks.append(task)
+            task_slots.append(slot)
+
+        # pool.map keeps chapter order, so papers land exactly as the
+        # sequential loop produced them
+        with ThreadPoolExecutor(
+            max_workers=min(_PAPER_WORKERS, len(unique_tasks))
+        ) as pool:
+            results = list(pool.map(load_or_fetch, unique_tasks))
+
+        saved_paths: Dict[int, Path] = {}
+        type_counts: Dict[str, int] = {}
+        for (paper_type, chapter_name, paper_id, paper_name, _cached), slot in zip(
+            tasks, task_slots
+        ):
+            paper_data, reused_path = results[slot]
+            if not paper_data:
+                continue
 
-                if paper_data:
+            # Write (or register the reused file) once per unique paper;
+            # duplicate references share the same file on disk
+            filepath = saved_paths.get(slot)
+            if filepath is None:
+                if reused_path is not None:
+                    filepath = reused_path
+                else:
                     filepath = self.save_paper_json(
-                        paper_data, course_name, homework_name, "homework"
+                        paper_data,
+                        course_name,
+                        paper_name,
+                        paper_type,
+                        course_dir=course_dir,
                     )
-                    papers["homework"].append(
-                        {
-                            "name": homework_name,
-                            "chapter_name": chapter_name,
-                            "content_id": content_id,
-                            "file": filepath,
-                            "data": paper_data,
-                        }
-                    )
-                    self.stats["homeworks"] += 1
+                saved_paths[slot] = filepath
+            papers[paper_type].append(
+                {
+                    "name": paper_name,
+                    "chapter_name": chapter_name,
+                    _PAPER_ID_KEY[paper_type]: paper_id,
+                    "file": filepath,
+                    "data": paper_data,
+                }
+            )
+            stat_key = _PAPER_STATS[paper_type]
+            type_counts[stat_key] = type_counts.get(stat_key, 0) + 1
+
+        # One lock round-trip per course instead of one per paper
+        if type_counts:
+            self._count_many(type_counts)
 
         return papers
 
@@ -352,11 +496,46 @@ class CourseFetcher:
 
         return self.fetch_selected_courses(courses)
 
-    def fetch_selected_courses(self, courses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _fetch_one_course(
+        self, index: int, total: int, course: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """Fetch info and papers for a single course.
+
+        Returns:
+            The course's all_data entry, or None if the info fetch failed
+        """
+        course_name = course.get("name", "Unknown")
+        print(f"\n{'=' * 60}")
+        print(f"Course {index}/{total}: {course_name}")
+        print(f"{'=' * 60}")
+
+        # Fetch course info
+        course_info = self.fetch_course_info(course)
+        if not course_info:
+            return None
+
+        # Fetch all papers
+        papers = self.fetch_all_papers_for_course(course, course_info)
+
+        self._count("courses")
+        return {
+            "course": course,
+            "course_info": course_info,
+            "papers": papers,
+        }
+
+    def fetch_selected_courses(
+        self, courses: List[Dict[str, Any]], max_workers: int = _FETCH_WORKERS
+    ) -> Dict[str, Any]:
         """Fetch papers for selected courses.
 
+        Courses are independent and the work is dominated by request
+        latency, so they fetch concurrently on a thread pool; results
+        land in input order regardless of completion order.
+
         Args:
             courses: List of course dictionaries to fetch
+            max_workers: Concurrent course fetches
 
         Returns:
             Dictionary containing all fetched data
@@ -364,32 +543,48 @@ class CourseFetcher:
         if not courses:
             return {}
 
+        total = len(courses)
         all_data = {}
 
-        # Process each course
-        for i, course in enumerate(courses, 1):
-            course_name = course.get("name", "Unknown")
-            print(f"\n{'=' * 60}")
-            print(f"Course {i}/{len(courses)}: {course_name}")
-            print(f"{'=' * 60}")
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as pool:
+            entries = pool.map(
+                lambda item: self._fetch_one_course(item[0], total, item[1]),
+                enumerate(courses, 1),
+            )
+            for course, entry in zip(courses, entries):
+                if entry is not None:
+                    all_data[course.get("name", "Unknown")] = entry
 
-            # Fetch course info
-            course_info = self.fetch_course_info(course)
-            if not course_info:
-                continue
+        return all_data
 
-            # Fetch all papers
-            papers = self.fetch_all_papers_for_course(course, course_info)
+    def iter_selected_courses(
+        self, courses: List[Dict[str, Any]], max_workers: int = _FETCH_WORKERS
+    ):
+        """Yield (course_name, entry) pairs as course fetches complete.
 
-            all_data[course_name] = {
-                "course": course,
-                "course_info": course_info,
-                "papers": papers,
-            }
+        Unlike fetch_selected_courses this yields in completion order, so
+        callers can overlap downstream work (Markdown export, conversion)
+        with the fetches still in flight.
 
-            self.stats["courses"] += 1
+        Args:
+            courses: List of course dictionaries to fetch
+            max_workers: Concurrent course fetches
+        """
+        if not courses:
+            return
 
-        return all_data
+        total = len(courses)
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as pool:
+            futures = {
+                pool.submit(self._fetch_one_course, i, total, course): course
+                for i, course in enumerate(courses, 1)
+            }
+            for future in as_completed(futures):
+                entry = future.result()
+                if entry is not None:
+                    course = futures[future]
+                    yield course.get("name", "Unknown"), entry
 
     def print_stats(self):
         """Print fetching statistics."""
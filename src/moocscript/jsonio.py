@@ -0,0 +1,82 @@
+"""Shared JSON serialization helpers for the fetcher and scripts."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+# orjson serializes several times faster than the stdlib encoder and
+# emits bytes directly; fall back to json when it is not installed
+try:
+    import orjson
+
+    def dump_json_bytes(
+        obj: Any, default: Optional[Callable] = None, compact: bool = False
+    ) -> bytes:
+        """Serialize to UTF-8 JSON bytes.
+
+        Args:
+            obj: Object to serialize
+            default: Optional hook called for otherwise unserializable
+                objects; lets callers serialize custom types in a single
+                encoder pass instead of pre-converting the whole graph
+            compact: Skip pretty-printing (smaller and faster; use for
+                bulk machine-read output)
+        """
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=default, option=option)
+
+    def load_json_bytes(data: bytes) -> Any:
+        """Parse JSON from UTF-8 bytes."""
+        return orjson.loads(data)
+except ImportError:
+    def dump_json_bytes(
+        obj: Any, default: Optional[Callable] = None, compact: bool = False
+    ) -> bytes:
+        """Serialize to UTF-8 JSON bytes.
+
+        Args:
+            obj: Object to serialize
+            default: Optional hook called for otherwise unserializable
+                objects; lets callers serialize custom types in a single
+                encoder pass instead of pre-converting the whole graph
+            compact: Skip pretty-printing (smaller and faster; use for
+                bulk machine-read output)
+        """
+        if compact:
+            return json.dumps(
+                obj, ensure_ascii=False, separators=(",", ":"), default=default
+            ).encode("utf-8")
+        return json.dumps(
+            obj, ensure_ascii=False, indent=2, default=default
+        ).encode("utf-8")
+
+    def load_json_bytes(data: bytes) -> Any:
+        """Parse JSON from UTF-8 bytes."""
+        return json.loads(data)
+
+
+def atomic_write_json(
+    path: Union[str, Path],
+    obj: Any,
+    default: Optional[Callable] = None,
+    compact: bool = False,
+) -> None:
+    """Write obj as JSON through a temp file and an atomic rename.
+
+    The serialized bytes land in a single write and os.replace swaps the
+    file in atomically, so an interrupted run never leaves a truncated
+    JSON file behind.
+
+    Args:
+        path: Destination file path
+        obj: JSON-serializable object
+        default: Optional hook forwarded to the encoder for custom types
+        compact: Skip pretty-printing (forwarded to the encoder)
+    """
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(dump_json_bytes(obj, default=default, compact=compact))
+    os.replace(tmp, path)
@@ -4,14 +4,14 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Status:
     """API response status."""
     code: int
     message: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Result:
     """Generic API response wrapper.
     
@@ -33,25 +33,25 @@ class Result:
         return cls(status=status, results=data.get("results"))
 
 
-@dataclass
+@dataclass(slots=True)
 class Pagination:
     """Pagination information."""
     totlePageCount: int  # Note: keeping original typo from API
 
 
-@dataclass
+@dataclass(slots=True)
 class SchoolPanel:
     """School information."""
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TermPanel:
     """Term information."""
     id: int
 
 
-@dataclass
+@dataclass(slots=True)
 class Course:
     """Course information."""
     id: int
@@ -63,7 +63,7 @@ class Course:
     termPanel: TermPanel
 
 
-@dataclass
+@dataclass(slots=True)
 class Homework:
     """Homework information."""
     contentId: int
@@ -71,7 +71,7 @@ class Homework:
     contentType: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Quiz:
     """Quiz information."""
     contentId: int
@@ -79,14 +79,14 @@ class Quiz:
     contentType: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Exam:
     """Exam information."""
     objectTestVo: Optional[Dict[str, Any]] = None
     subjectTestVo: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Chapter:
     """Chapter information."""
     id: int
@@ -96,7 +96,7 @@ class Chapter:
     exam: Optional[Exam] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class OptionDto:
     """Multiple choice option."""
     id: str
@@ -104,7 +104,7 @@ class OptionDto:
     content: str
 
 
-@dataclass
+@dataclass(slots=True)
 class ObjectiveQ:
     """Objective question (multiple choice, etc.)."""
     id: int
@@ -114,14 +114,14 @@ class ObjectiveQ:
     stdAnswer: str
 
 
-@dataclass
+@dataclass(slots=True)
 class JudgeDto:
     """Subjective question judge criteria."""
     id: int
     msg: str
 
 
-@dataclass
+@dataclass(slots=True)
 class SubjectiveQ:
     """Subjective question."""
     id: int
@@ -130,7 +130,7 @@ class SubjectiveQ:
     judgeDtos: List[JudgeDto]
 
 
-@dataclass
+@dataclass(slots=True)
 class MocPaperDto:
     """Paper/Test data structure."""
     objectiveQList: List[ObjectiveQ]
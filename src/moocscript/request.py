@@ -1,11 +1,17 @@
 """Core request handling for MOOC API."""
 
 import json
+import threading
+import time
 from typing import Any, Dict, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from moocscript.cache import ResponseCache
 from moocscript.config import APIConfig
+from moocscript.jsonio import load_json_bytes
 from moocscript.models import Result, Status
 
 
@@ -19,18 +25,79 @@ class APIRequestError(RequestError):
     pass
 
 
+class _TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to a burst of
+    ``rate`` tokens; acquire() sleeps just long enough for the next
+    token. This keeps the pooled fetcher threads collectively under the
+    server's rate limit instead of bursting and triggering 429 backoff
+    cycles.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self._tokens = rate
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
 class RequestClient:
     """Core HTTP client for MOOC API requests."""
     
-    def __init__(self, config: APIConfig):
+    def __init__(self, config: APIConfig, cache: Optional[ResponseCache] = None):
         """Initialize request client.
         
         Args:
             config: API configuration
+            cache: Optional on-disk response cache; when set, successful
+                responses are served from and written to it
         """
         self.config = config
+        self.cache = cache
         self.session = requests.Session()
         self.session.headers.update(self.config.headers)
+
+        # Size the connection pool for the fetcher's thread fan-out and
+        # retry transient server/rate-limit errors with backoff. The
+        # API's POST endpoints are read-only queries, so retrying them
+        # is safe (allowed_methods=None retries every method).
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=None,
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # The base URL never changes per client; normalize it once
+        self._base_url = self.config.base_url.rstrip("/")
+
+        # Shared across all fetcher threads so total request rate stays
+        # below the configured cap
+        self._limiter = (
+            _TokenBucket(self.config.rate_limit) if self.config.rate_limit > 0 else None
+        )
     
     def request(
         self,
@@ -53,7 +120,7 @@ class RequestClient:
         Raises:
             APIRequestError: If request fails
         """
-        url = f"{self.config.base_url.rstrip('/')}/{endpoint.lstrip('/')}"
+        url = f"{self._base_url}/{endpoint.lstrip('/')}"
         
         # Prepare query parameters
         params = query.copy() if query else {}
@@ -62,6 +129,16 @@ class RequestClient:
         # Convert all query values to strings (matching original behavior)
         params = {k: str(v) for k, v in params.items()}
         
+        # Serve from the on-disk cache when a fresh entry exists; the
+        # mob-token is part of params, so the key is account-specific
+        if self.cache is not None:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return Result.from_dict(cached)
+        
+        if self._limiter is not None:
+            self._limiter.acquire()
+        
         try:
             # Make request
             if method.upper() == "POST":
@@ -79,7 +156,14 @@ class RequestClient:
                 )
             
             response.raise_for_status()
-            data = response.json()
+            # Decode the raw bytes ourselves so the optional orjson
+            # parser applies; paper payloads make this a hot path
+            data = load_json_bytes(response.content)
+            
+            # Cache only successful responses so transient errors are
+            # never replayed from disk
+            if self.cache is not None and data.get("status", {}).get("code") == 0:
+                self.cache.set(endpoint, params, data)
             
             # Wrap response in Result structure
             return Result.from_dict(data)
@@ -0,0 +1,75 @@
+"""Interactive console helpers shared by the fetch scripts."""
+
+import re
+import sys
+from typing import Any, Dict, List
+
+# Selection tokens: a number, optionally a "lo-hi" range
+_SELECTION_RE = re.compile(r"(\d+)(?:\s*-\s*(\d+))?")
+
+
+def select_courses_interactively(courses: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Interactive course selection.
+
+    Args:
+        courses: List of course dictionaries
+
+    Returns:
+        List of selected course dictionaries
+    """
+    print("=" * 60)
+    print("课程列表")
+    print("=" * 60)
+
+    # Extract the names once; the display and confirmation loops both
+    # need them
+    names = [course.get("name", "Unknown") for course in courses]
+
+    # Display all courses in one buffered write instead of a print
+    # (and stdout lock acquisition) per line
+    sys.stdout.write(
+        "\n".join(f"{i:3d}. {name}" for i, name in enumerate(names, 1)) + "\n"
+    )
+
+    print("=" * 60)
+    print("\n请选择要下载的课程（输入序号，多个用逗号分隔，如：1,3,5 或输入 all 下载全部）：")
+
+    while True:
+        try:
+            user_input = input("> ").strip()
+
+            if not user_input:
+                print("未选择任何课程")
+                return []
+
+            if user_input.lower() == "all":
+                print(f"\n已选择全部 {len(courses)} 门课程")
+                return courses
+
+            # Tokenize "1,3,5-8" style input in one regex pass; bounds
+            # checking, dedup and sorting collapse into a comprehension
+            tokens = _SELECTION_RE.findall(user_input)
+            selected_indices = sorted({
+                i
+                for lo, hi in tokens
+                for i in range(int(lo), int(hi or lo) + 1)
+                if 1 <= i <= len(courses)
+            })
+
+            if not selected_indices:
+                print("未选择任何有效课程，请重新输入")
+                continue
+
+            selected_courses = [courses[i - 1] for i in selected_indices]
+
+            lines = [f"\n已选择 {len(selected_courses)} 门课程："]
+            lines.extend(f"  {idx}. {names[idx - 1]}" for idx in selected_indices)
+            sys.stdout.write("\n".join(lines) + "\n")
+
+            return selected_courses
+
+        except KeyboardInterrupt:
+            print("\n\n已取消选择")
+            return []
+        except Exception as e:
+            print(f"输入错误: {str(e)}，请重新输入")